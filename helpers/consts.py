@@ -1,9 +1,8 @@
 from django.conf import settings
-from django.core.files.storage import FileSystemStorage
 
-S3_REVIEW_IMAGE_BUCKET_STORAGE = FileSystemStorage(
-    location="", base_url=settings.REVIEW_IMAGE_HOST
-)
+from helpers.storage import S3Storage
+
+S3_REVIEW_IMAGE_BUCKET_STORAGE = S3Storage()
 
 HOME_CATEGORY_UI_GUIDE_TEXT = {
     settings.OWN_DELIVERY_HOME_CATEGORY_CODE: "빠르게 먹고 싶을 땐, \n익스프레스!",  # 익스프레스
@@ -0,0 +1,27 @@
+from django.db import connections, router
+
+DELETE_BATCH_SIZE = 500
+
+
+def delete_where_in(model, field_name, values, using=None):
+    """Runs `DELETE FROM <table> WHERE <column> IN (...)` for `values` of the
+    `field_name` column of `model`, in batches of `DELETE_BATCH_SIZE`, and returns the
+    number of deleted rows.
+
+    Rows are neither loaded nor cascaded and no delete signal is sent, so callers
+    remove dependent rows first and invalidate what the signals would have."""
+    values = list(values)
+    connection = connections[using or router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+    sql = "DELETE FROM {} WHERE {} IN ({{}})".format(
+        quote_name(model._meta.db_table),
+        quote_name(model._meta.get_field(field_name).column),
+    )
+
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(values), DELETE_BATCH_SIZE):
+            batch = values[start : start + DELETE_BATCH_SIZE]
+            cursor.execute(sql.format(", ".join(["%s"] * len(batch))), batch)
+            deleted += cursor.rowcount
+    return deleted
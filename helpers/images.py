@@ -0,0 +1,108 @@
+import struct
+from collections import namedtuple
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8"
+# SOF 마커 중 DHT (C4), JPG (C8), DAC (CC) 는 제외
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# 길이 필드가 없는 마커 (TEM, RST0~7)
+JPEG_STANDALONE_MARKERS = frozenset([0x01] + list(range(0xD0, 0xD8)))
+JPEG_MAX_SEGMENTS = 256
+
+
+class ImageInfo(namedtuple("ImageInfo", ["format", "width", "height"])):
+    __slots__ = ()
+
+
+class ImageHeaderError(ValueError):
+    pass
+
+
+def _read_exact(fp, size):
+    data = fp.read(size)
+    if len(data) != size:
+        raise ImageHeaderError("unexpected end of image header")
+    return data
+
+
+def _read_png(fp):
+    # 시그니처 뒤 첫 chunk 는 항상 IHDR 입니다.
+    length, chunk_type, width, height = struct.unpack(">I4sII", _read_exact(fp, 16))
+    if chunk_type != b"IHDR" or length != 13:
+        raise ImageHeaderError("PNG without IHDR chunk")
+    return ImageInfo("png", width, height)
+
+
+def _read_jpeg(fp):
+    for _ in range(JPEG_MAX_SEGMENTS):
+        if _read_exact(fp, 1) != b"\xff":
+            raise ImageHeaderError("JPEG marker expected")
+        marker = _read_exact(fp, 1)[0]
+        while marker == 0xFF:  # fill bytes
+            marker = _read_exact(fp, 1)[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):  # EOI, SOS 이전에 SOF 가 있어야 합니다.
+            break
+
+        (length,) = struct.unpack(">H", _read_exact(fp, 2))
+        if length < 2:
+            raise ImageHeaderError("invalid JPEG segment length")
+        if marker in JPEG_SOF_MARKERS:
+            _, height, width = struct.unpack(">BHH", _read_exact(fp, 5))
+            return ImageInfo("jpeg", width, height)
+        # EXIF 등 큰 segment 는 읽지 않고 건너뜁니다.
+        fp.seek(length - 2, 1)
+    raise ImageHeaderError("JPEG without SOF segment")
+
+
+def _read_webp(fp):
+    riff_type = _read_exact(fp, 4)
+    chunk_type = _read_exact(fp, 8)[:4]  # chunk 이름, chunk 크기
+    if riff_type != b"WEBP":
+        raise ImageHeaderError("RIFF file is not WebP")
+    data = _read_exact(fp, 10)
+
+    if chunk_type == b"VP8 ":
+        if data[3:6] != b"\x9d\x01\x2a":
+            raise ImageHeaderError("invalid VP8 start code")
+        width, height = struct.unpack("<HH", data[6:10])
+        return ImageInfo("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk_type == b"VP8L":
+        if data[0] != 0x2F:
+            raise ImageHeaderError("invalid VP8L signature")
+        (bits,) = struct.unpack("<I", data[1:5])
+        return ImageInfo("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk_type == b"VP8X":
+        width = int.from_bytes(data[4:7], "little") + 1
+        height = int.from_bytes(data[7:10], "little") + 1
+        return ImageInfo("webp", width, height)
+    raise ImageHeaderError("unknown WebP chunk {!r}".format(chunk_type))
+
+
+def read_image_info(fp):
+    """Returns the format and dimensions of a PNG, JPEG or WebP image in the file
+    object `fp`, reading only its header.
+
+    Pixel data is never read or decoded: a PNG or WebP takes a few dozen bytes, and a
+    JPEG is walked segment by segment with seeks up to its frame header, at most
+    `JPEG_MAX_SEGMENTS` segments. The position of `fp` is restored afterwards. Raises
+    ImageHeaderError when the header is not a supported image."""
+    position = fp.tell()
+    try:
+        fp.seek(0)
+        head = fp.read(12)
+        if head.startswith(PNG_SIGNATURE):
+            fp.seek(len(PNG_SIGNATURE))
+            return _read_png(fp)
+        if head.startswith(JPEG_SIGNATURE):
+            fp.seek(len(JPEG_SIGNATURE))
+            return _read_jpeg(fp)
+        if head.startswith(b"RIFF"):
+            fp.seek(8)
+            return _read_webp(fp)
+        raise ImageHeaderError("unsupported image format")
+    except struct.error as err:
+        raise ImageHeaderError(str(err))
+    finally:
+        fp.seek(position)
@@ -0,0 +1,160 @@
+import codecs
+import io
+import json
+import math
+import re
+
+# RFC 8259 의 토큰 (공백, 문자열, 숫자, 리터럴, 구분자)
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<ws>[ \t\n\r]+)
+    |(?P<string>"(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*")
+    |(?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+    |(?P<literal>true|false|null)
+    |(?P<punct>[{}\[\]:,])
+    """,
+    re.VERBOSE,
+)
+# Lottie 스키마의 최상위 필수 키
+LOTTIE_REQUIRED_KEYS = frozenset(["v", "fr", "ip", "op", "w", "h", "layers"])
+# 이 이상의 실수는 소수점 자리수를 줄여도 짧아지지 않습니다.
+MAX_ROUNDED_NUMBER = 1e15
+
+# 숫자 토큰 뒤에 "e+" 까지 와야 숫자가 끝났는지 알 수 있습니다.
+TOKEN_LOOKAHEAD = 3
+
+VALUE, VALUE_OR_END, KEY, KEY_OR_END, COLON, COMMA_OR_END, DONE = range(7)
+
+
+class LottieError(ValueError):
+    pass
+
+
+def round_number(token, precision):
+    """Rounds a JSON number token to `precision` decimal places and drops trailing
+    zeros. Integers and very large numbers are returned unchanged."""
+    if not any(char in token for char in ".eE"):
+        return token
+    value = float(token)
+    if not math.isfinite(value) or abs(value) >= MAX_ROUNDED_NUMBER:
+        return token
+    text = "{:.{}f}".format(round(value, precision), precision)
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+class _Minifier:
+    __slots__ = ("max_depth", "precision", "stack", "expect", "root_keys", "output")
+
+    def __init__(self, max_depth, precision):
+        self.max_depth = max_depth
+        self.precision = precision
+        self.stack = []
+        self.expect = VALUE
+        self.root_keys = set()
+        self.output = io.StringIO()
+
+    def _after_value(self):
+        self.expect = COMMA_OR_END if self.stack else DONE
+
+    def feed(self, kind, token):
+        expect = self.expect
+        if kind == "punct":
+            if token in "{[":
+                if expect not in (VALUE, VALUE_OR_END):
+                    raise LottieError("unexpected {!r}".format(token))
+                if not self.stack and token != "{":
+                    raise LottieError("Lottie root must be an object")
+                if len(self.stack) >= self.max_depth:
+                    raise LottieError("nested deeper than {}".format(self.max_depth))
+                self.stack.append(token)
+                self.expect = KEY_OR_END if token == "{" else VALUE_OR_END
+            elif token in "}]":
+                opening = "{" if token == "}" else "["
+                allowed = KEY_OR_END if token == "}" else VALUE_OR_END
+                if not self.stack or self.stack[-1] != opening:
+                    raise LottieError("unbalanced {!r}".format(token))
+                if expect not in (allowed, COMMA_OR_END):
+                    raise LottieError("unexpected {!r}".format(token))
+                self.stack.pop()
+                self._after_value()
+            elif token == ":":
+                if expect != COLON:
+                    raise LottieError("unexpected ':'")
+                self.expect = VALUE
+            else:
+                if expect != COMMA_OR_END:
+                    raise LottieError("unexpected ','")
+                self.expect = KEY if self.stack[-1] == "{" else VALUE
+        elif kind == "string" and expect in (KEY, KEY_OR_END):
+            if len(self.stack) == 1:
+                self.root_keys.add(json.loads(token))
+            self.expect = COLON
+        elif expect in (VALUE, VALUE_OR_END):
+            if not self.stack:
+                raise LottieError("Lottie root must be an object")
+            if kind == "number":
+                token = round_number(token, self.precision)
+            self._after_value()
+        else:
+            raise LottieError("unexpected {}".format(kind))
+        self.output.write(token)
+
+    def finish(self):
+        if self.expect != DONE:
+            raise LottieError("unexpected end of JSON")
+        missing = LOTTIE_REQUIRED_KEYS - self.root_keys
+        if missing:
+            raise LottieError(
+                "missing Lottie keys: {}".format(", ".join(sorted(missing)))
+            )
+        return self.output.getvalue().encode("utf-8")
+
+
+def minify_lottie(fp, max_bytes, max_depth, precision, chunk_size=64 * 1024):
+    """Validates the Lottie JSON in the binary file object `fp` and returns it minified:
+    whitespace removed and fractional numbers rounded to `precision` decimal places.
+
+    The file is read in `chunk_size` chunks and tokenized incrementally, so at most
+    `max_bytes` are ever read and only the minified output is kept in memory. Raises
+    LottieError when the file is larger than `max_bytes`, nested deeper than
+    `max_depth`, is not valid UTF-8 JSON or lacks the top level Lottie keys."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    minifier = _Minifier(max_depth, precision)
+    buffer = ""
+    read_bytes = 0
+    eof = False
+
+    fp.seek(0)
+    while not eof:
+        chunk = fp.read(chunk_size)
+        read_bytes += len(chunk)
+        if read_bytes > max_bytes:
+            raise LottieError("larger than {} bytes".format(max_bytes))
+        eof = not chunk
+        try:
+            buffer += decoder.decode(chunk, final=eof)
+        except UnicodeDecodeError as err:
+            raise LottieError(str(err))
+
+        position = 0
+        while position < len(buffer):
+            match = TOKEN_PATTERN.match(buffer, position)
+            # 청크 경계에서 잘렸을 수 있는 토큰 ("1." 이나 "1e+" 처럼 숫자가 이어질 수 있는 경우 포함) 은
+            # 다음 청크와 이어서 읽습니다.
+            if match is None or (
+                not eof and match.end() + TOKEN_LOOKAHEAD > len(buffer)
+            ):
+                if eof:
+                    raise LottieError(
+                        "invalid JSON at {!r}".format(buffer[position:][:20])
+                    )
+                break
+            kind = match.lastgroup
+            if kind != "ws":
+                minifier.feed(kind, match.group())
+            position = match.end()
+        buffer = buffer[position:]
+
+    return minifier.finish()
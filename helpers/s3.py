@@ -1,10 +1,14 @@
 import urllib
+from functools import lru_cache
 from urllib.parse import urljoin
 
 from django.conf import settings
 
 from helpers.consts import VMS_FILE_PREFIX
 
+# 프로세스마다 기억하는 이미지 URL 수
+S3_URL_CACHE_SIZE = 4096
+
 
 def get_s3_review_image_bucket_url(img):
     if not img:
@@ -12,3 +16,10 @@ def get_s3_review_image_bucket_url(img):
     if img.startswith(VMS_FILE_PREFIX):
         return img.replace(VMS_FILE_PREFIX, settings.VMS_S3_FILE_URL_PREFIX)
     return urljoin(settings.REVIEW_IMAGE_HOST, urllib.parse.quote(img.encode("utf-8")))
+
+
+@lru_cache(maxsize=S3_URL_CACHE_SIZE)
+def cached_s3_review_image_bucket_url(img):
+    """Memoized `get_s3_review_image_bucket_url` for rows saved before the public URL
+    was stored with them. Call `cache_clear()` after the URL settings change."""
+    return get_s3_review_image_bucket_url(img)
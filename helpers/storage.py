@@ -0,0 +1,127 @@
+import mimetypes
+import threading
+from urllib.parse import quote, urljoin
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+
+NOT_FOUND_ERROR_CODES = frozenset(["404", "NoSuchKey", "NotFound"])
+
+
+@deconstructible
+class S3Storage(Storage):
+    """Django storage on an S3 bucket, configured by the `REVIEW_IMAGE_S3_*` settings.
+
+    One boto3 client is created lazily and shared by every thread, so uploads from the
+    upload pool reuse its keep-alive connection pool instead of opening a connection
+    per file. Files larger than the multipart threshold are uploaded in parts
+    concurrently. Set `REVIEW_IMAGE_S3_ENDPOINT_URL` to run against a local S3
+    compatible server such as minio.
+
+    Keys are never renamed: saving to an existing key overwrites it, which is safe for
+    the content addressed paths uploads use."""
+
+    def __init__(self, bucket_name=None, base_url=None):
+        self.bucket_name = bucket_name
+        self.base_url = base_url
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.session.Session().client(
+                        "s3",
+                        endpoint_url=settings.REVIEW_IMAGE_S3_ENDPOINT_URL,
+                        region_name=settings.REVIEW_IMAGE_S3_REGION,
+                        config=Config(
+                            max_pool_connections=(
+                                settings.REVIEW_IMAGE_S3_MAX_POOL_CONNECTIONS
+                            ),
+                            tcp_keepalive=True,
+                            connect_timeout=settings.REVIEW_IMAGE_S3_TIMEOUT,
+                            read_timeout=settings.REVIEW_IMAGE_S3_TIMEOUT,
+                            retries={
+                                "mode": "standard",
+                                "max_attempts": settings.REVIEW_IMAGE_S3_MAX_ATTEMPTS,
+                            },
+                        ),
+                    )
+        return self._client
+
+    @property
+    def bucket(self):
+        return self.bucket_name or settings.REVIEW_IMAGE_S3_BUCKET
+
+    @property
+    def transfer_config(self):
+        return TransferConfig(
+            multipart_threshold=settings.REVIEW_IMAGE_S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.REVIEW_IMAGE_S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.REVIEW_IMAGE_S3_TRANSFER_CONCURRENCY,
+        )
+
+    def _head(self, name):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=name)
+        except ClientError as err:
+            if err.response["Error"]["Code"] in NOT_FOUND_ERROR_CODES:
+                return None
+            raise
+
+    def _open(self, name, mode="rb"):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=name)
+        except ClientError as err:
+            if err.response["Error"]["Code"] in NOT_FOUND_ERROR_CODES:
+                raise FileNotFoundError(name) from err
+            raise
+        return ContentFile(response["Body"].read(), name=name)
+
+    def _save(self, name, content):
+        content_type = (
+            mimetypes.guess_type(name)[0]
+            or getattr(content, "content_type", None)
+            or "application/octet-stream"
+        )
+        content.seek(0)
+        self.client.upload_fileobj(
+            content,
+            self.bucket,
+            name,
+            ExtraArgs={
+                "ContentType": content_type,
+                "CacheControl": settings.REVIEW_IMAGE_S3_CACHE_CONTROL,
+            },
+            Config=self.transfer_config,
+        )
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        # 이미 있는 키인지 묻는 요청을 보내지 않고 덮어씁니다.
+        return name
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=name)
+
+    def exists(self, name):
+        return self._head(name) is not None
+
+    def size(self, name):
+        head = self._head(name)
+        if head is None:
+            raise FileNotFoundError(name)
+        return head["ContentLength"]
+
+    def url(self, name):
+        return urljoin(
+            self.base_url or settings.REVIEW_IMAGE_HOST, quote(name.encode("utf-8"))
+        )
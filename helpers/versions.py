@@ -0,0 +1,17 @@
+import re
+
+APP_VERSION_PATTERN = re.compile(r"^\s*v?(\d+(?:\.\d+)*)")
+APP_VERSION_MIN_PARTS = 3
+
+
+def parse_app_version(value):
+    """Parses an app version string into a comparable tuple of integers.
+
+    "6.14" and "6.14.0" compare equal, and the numeric prefix of test builds such as
+    "6.14.0-qa" is used. Returns None when `value` has no numeric prefix."""
+    match = APP_VERSION_PATTERN.match(value or "")
+    if not match:
+        return None
+    parts = [int(part) for part in match.group(1).split(".")]
+    parts.extend([0] * (APP_VERSION_MIN_PARTS - len(parts)))
+    return tuple(parts)
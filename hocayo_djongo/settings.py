@@ -130,6 +130,54 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # 홈카에 필요한 환경변수들
 REVIEW_IMAGE_HOST = "https://dev-rev-static.yogiyo.co.kr"
+## "VMS:" 로 시작하는 이미지 경로의 URL prefix (이 값이나 REVIEW_IMAGE_HOST 를 바꾸면 recompute_home_category_image_urls 실행)
+VMS_S3_FILE_URL_PREFIX = "https://dev-vms-static.yogiyo.co.kr/"
+
+## 홈카 응답 캐시 (초, 이벤트 이미지의 시작/종료 시각이 더 가까우면 그 시각에 만료)
+HOME_CATEGORY_PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 6
+## 목록 그룹 generation 캐시 (초, 캐시를 공유하지 않는 프로세스 간의 최대 지연)
+HOME_CATEGORY_GENERATION_CACHE_TIMEOUT = 5
+## fwf_id 로 찾은 목록 그룹 캐시 (초, 캐시를 공유하지 않는 프로세스에서 그룹의 생성/삭제/복제 완료가 반영되는 최대 지연)
+HOME_CATEGORY_LIST_GROUP_ID_CACHE_TIMEOUT = 5
+## 프로세스에 보관하는 기본 목록 그룹 (초, 다른 프로세스에서 기본 그룹이 바뀐 경우의 최대 지연)
+HOME_CATEGORY_DEFAULT_LIST_GROUP_TIMEOUT = 60
+## 시간대별 홈카 응답 기록 디렉터리 (None 이면 기록하지 않음, TTL 을 분석할 환경에서만 지정. 예: "/var/log/hocayo/home_category_responses")
+HOME_CATEGORY_RESPONSE_LOG_DIR = None
+## 홈카 응답 기록을 파일에 쓰는 최대 간격 (초, 프로세스가 비정상 종료되면 이만큼의 기록을 잃음)
+HOME_CATEGORY_RESPONSE_LOG_FLUSH_INTERVAL = 10
+## 홈카 목록 그룹 작업 (복제/동기화/삭제) 을 실행하는 스레드 수
+HOME_CATEGORY_JOB_WORKERS = 2
+## 실행 중인 목록 그룹 작업의 heartbeat 간격 (초, 3번 이상 끊기면 run_home_category_jobs --watch 가 작업을 다시 실행)
+HOME_CATEGORY_JOB_HEARTBEAT_INTERVAL = 30
+## 목록 그룹 삭제 작업이 한 트랜잭션에서 지우는 카테고리 수
+HOME_CATEGORY_DELETE_CHUNK_SIZE = 500
+## 동기화 작업이 한 트랜잭션에서 처리하는 대상 그룹 수
+HOME_CATEGORY_SYNC_BATCH_SIZE = 20
+## 홈카 이미지 업로드 동시 실행 수 (모든 어드민 요청이 공유), 시도 횟수, 재시도 간격 (초, 시도마다 2배)
+HOME_CATEGORY_UPLOAD_WORKERS = 8
+HOME_CATEGORY_UPLOAD_ATTEMPTS = 3
+HOME_CATEGORY_UPLOAD_RETRY_BACKOFF = 0.2
+## 리뷰 이미지 S3 버킷 (endpoint 를 지정하면 minio 같은 로컬 S3 호환 서버를 사용, None 이면 AWS)
+REVIEW_IMAGE_S3_BUCKET = "dev-rev-static"
+REVIEW_IMAGE_S3_REGION = "ap-northeast-2"
+REVIEW_IMAGE_S3_ENDPOINT_URL = None
+## S3 요청 타임아웃 (초), 요청당 최대 시도 횟수
+REVIEW_IMAGE_S3_TIMEOUT = 10
+REVIEW_IMAGE_S3_MAX_ATTEMPTS = 3
+## 파일 하나를 올릴 때 동시에 전송하는 part 수, multipart 로 올리는 파일 크기와 part 크기 (bytes, S3 의 최소 part 크기는 5MiB)
+REVIEW_IMAGE_S3_TRANSFER_CONCURRENCY = 4
+REVIEW_IMAGE_S3_MULTIPART_THRESHOLD = 5 * 1024 * 1024
+REVIEW_IMAGE_S3_MULTIPART_CHUNKSIZE = 5 * 1024 * 1024
+## 모든 업로드 스레드가 공유하는 keep-alive 연결 풀 크기
+REVIEW_IMAGE_S3_MAX_POOL_CONNECTIONS = (
+    HOME_CATEGORY_UPLOAD_WORKERS * REVIEW_IMAGE_S3_TRANSFER_CONCURRENCY
+)
+## 업로드 경로는 내용의 해시라서 CDN 과 앱이 영원히 캐시해도 됩니다.
+REVIEW_IMAGE_S3_CACHE_CONTROL = "public, max-age=31536000, immutable"
+## 홈카 Lottie 파일 최대 크기 (bytes), 최대 중첩 깊이, 실수의 소수점 자리수 (업로드 전에 반올림)
+HOME_CATEGORY_LOTTIE_MAX_BYTES = 2 * 1024 * 1024
+HOME_CATEGORY_LOTTIE_MAX_DEPTH = 64
+HOME_CATEGORY_LOTTIE_FLOAT_PRECISION = 3
 
 ## 홈카 코드들
 TAKEOUT_HOME_CATEGORY_CODE = "takeout"
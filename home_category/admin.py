@@ -1,5 +1,9 @@
-from django.contrib import admin
-from django.utils.encoding import smart_str
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
 from home_category.consts import HOME_CATEGORY_ADMIN_NOTICE
@@ -8,9 +12,12 @@ from home_category.forms import (EventHomeCategoryImageForm,
                                  HomeCategoryForm, HomeCategoryImageForm,
                                  HomeCategoryImageInlineFormset,
                                  HomeCategoryListGroupForm)
+from home_category.jobs import enqueue_job
 from home_category.models import (FunctionalCategoryImagesPositions,
                                   HomeCategory, HomeCategoryImage,
-                                  HomeCategoryListGroup)
+                                  HomeCategoryListGroup,
+                                  HomeCategoryListGroupJob,
+                                  HomeCategoryListGroupJobKind)
 
 IMAGE_TEMPLATE = """
 <a href="{url}" target="_blank">
@@ -31,20 +38,38 @@ LOTTIE_PLAYER_TEMPLATE = """
 """
 
 
-class RelatedOnlyFieldListFilter(admin.RelatedFieldListFilter):
-    # ref: https://github.com/django/django/blob/stable/1.4.x/django/contrib/admin/filters.py#L191
-    def choices(self, cl):
-        for pk_val, val in self.lookup_choices:
-            yield {
-                "selected": self.lookup_val == smart_str(pk_val),
-                "query_string": cl.get_query_string(
-                    {
-                        self.lookup_kwarg: pk_val,
-                    },
-                    [self.lookup_kwarg_isnull],
-                ),
-                "display": val,
-            }
+class ListGroupAutocompleteFilter(admin.RelatedFieldListFilter):
+    """List group filter that searches groups as you type through the admin autocomplete
+    view, so the sidebar only loads the selected group instead of every A/B group."""
+
+    template = "admin/home_category/list_group_autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super(ListGroupAutocompleteFilter, self).__init__(
+            field, request, params, model, model_admin, field_path
+        )
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model.objects.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+        )
+
+    def has_output(self):
+        return True
+
+    def field_choices(self, field, request, model_admin):
+        # 선택된 그룹은 자동완성 select 를 그릴 때 불러옵니다.
+        return []
+
+    def select(self):
+        return self.form_field.widget.render(
+            self.lookup_kwarg,
+            self.lookup_val,
+            attrs={
+                "id": "list-group-filter",
+                "data-lookup-kwarg": self.lookup_kwarg,
+                "style": "width: 100%",
+            },
+        )
 
 
 class HomeCategoryImageInline(admin.TabularInline):
@@ -180,6 +205,9 @@ class HomeCategoryAdmin(admin.ModelAdmin):
         "modified_at",
     )
     list_display_links = ("display_name",)
+    list_select_related = ("list_group",)
+    # 목록 그룹으로 거른 결과만 세고, 전체 행 수는 세지 않습니다.
+    show_full_result_count = False
     fieldsets = (
         (
             "기본 정보",
@@ -229,7 +257,7 @@ class HomeCategoryAdmin(admin.ModelAdmin):
     )
     list_filter = (
         "category_type",
-        ("list_group", RelatedOnlyFieldListFilter),
+        ("list_group", ListGroupAutocompleteFilter),
     )
 
     def get_readonly_fields(self, request, obj=None):
@@ -245,8 +273,9 @@ class HomeCategoryAdmin(admin.ModelAdmin):
             q["parent_category__isnull"] = "True"
 
         if "list_group__id__exact" not in q:
-            default_group = HomeCategoryListGroup.objects.get(is_default=True)
-            q["list_group__id__exact"] = default_group.pk
+            default_group_id = HomeCategoryListGroup.get_default_id()
+            if default_group_id is not None:
+                q["list_group__id__exact"] = default_group_id
 
         request.GET = q
         request.META["QUERY_STRING"] = request.GET.urlencode()
@@ -256,13 +285,23 @@ class HomeCategoryAdmin(admin.ModelAdmin):
         )
 
     def save_formset(self, request, form, formset, change):
-        instance_list = formset.save()
+        if formset.model is not HomeCategory:
+            formset.save()
+            return
+
+        # 하위 카테고리는 처음 저장할 때부터 상위 카테고리의 목록 그룹을 갖습니다.
+        list_group_id = form.instance.list_group_id
+        for child_form in formset.forms:
+            child_form.instance.list_group_id = list_group_id
+        formset.save()
 
-        # set list_group of child home categories
-        for instance in instance_list:
-            if hasattr(instance, "list_group"):
-                instance.list_group = form.instance.list_group
-                instance.save()
+        # 바뀌지 않은 하위 카테고리 중 목록 그룹이 다른 것은 한번에 고칩니다.
+        if (
+            HomeCategory.objects.filter(parent_category=form.instance)
+            .exclude(list_group_id=list_group_id)
+            .update(list_group_id=list_group_id)
+        ):
+            HomeCategoryListGroup.bump_generation(list_group_id)
 
     def delete_model(self, request, obj):
         if request.method == "POST":
@@ -271,6 +310,21 @@ class HomeCategoryAdmin(admin.ModelAdmin):
             return
         return super(HomeCategoryAdmin, self).delete_model(request, obj)
 
+    @property
+    def media(self):
+        # media 를 정의하면 Media 가 자동으로 합쳐지지 않으므로 직접 합칩니다.
+        list_group_widget = AutocompleteSelect(
+            self.model._meta.get_field("list_group"), self.admin_site
+        )
+        return (
+            super(HomeCategoryAdmin, self).media
+            + forms.Media(self.Media)
+            + list_group_widget.media
+            + forms.Media(
+                js=("admin/js/jquery.init.js", "home_category/js/list_group_filter.js")
+            )
+        )
+
     class Media:
         js = (
             "/media/js/lib/underscore/underscore.js",
@@ -305,6 +359,9 @@ class HomeCategoryListGroupAdmin(admin.ModelAdmin):
     )
     readonly_fields = ("is_default", "created_by", "home_category_list_link")
     ordering = ("-is_default",)
+    # 홈 카테고리 목록 그룹 필터의 자동완성에도 쓰입니다. 검색 방식은 get_search_results 참고
+    search_fields = ("name", "fwf_id")
+    actions = ("sync_from_default_list_group",)
 
     def home_category_list_link(self, obj):
         if not (obj and obj.pk):
@@ -317,6 +374,51 @@ class HomeCategoryListGroupAdmin(admin.ModelAdmin):
     home_category_list_link.short_description = "홈 카테고리 목록"
     home_category_list_link.allow_tags = True
 
+    def message_job(self, request, job, note="", level=messages.SUCCESS):
+        self.message_user(
+            request,
+            format_html(
+                '{} 작업이 등록되었습니다. {}<a href="{}">작업 목록</a>에서 진행 상황을 확인할 수 있습니다.',
+                job,
+                note,
+                reverse("admin:home_category_homecategorylistgroupjob_changelist"),
+            ),
+            level,
+        )
+
+    def message_user(self, request, message, level=messages.INFO, *args, **kwargs):
+        # 삭제는 등록된 작업이 하므로, 삭제 작업을 등록한 요청에서는 Django 의
+        # "삭제되었습니다" 안내 대신 delete_model 이 남긴 작업 등록 안내만 보여줍니다.
+        if level == messages.SUCCESS and getattr(request, "delete_jobs_queued", False):
+            return
+        return super(HomeCategoryListGroupAdmin, self).message_user(
+            request, message, level, *args, **kwargs
+        )
+
+    def sync_from_default_list_group(self, request, queryset):
+        source = HomeCategoryListGroup.objects.get(is_default=True)
+        target_ids = list(queryset.exclude(pk=source.pk).values_list("pk", flat=True))
+        job = enqueue_job(
+            HomeCategoryListGroupJobKind.SYNC,
+            source,
+            request.user,
+            target_ids=target_ids,
+        )
+        self.message_job(request, job)
+
+    sync_from_default_list_group.short_description = "선택된 그룹을 기본 그룹의 홈 카테고리로 동기화"
+
+    def get_search_results(self, request, queryset, search_term):
+        """Matches groups whose name starts with the term or whose fwf_id equals it.
+        Both lookups are case sensitive so they can use the indexes on the columns."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return (
+            queryset.filter(Q(name__startswith=search_term) | Q(fwf_id=search_term)),
+            False,
+        )
+
     def get_fieldsets(self, request, obj=None):
         if not obj:
             return ((None, {"fields": self.fields + ("clone_from",)}),)
@@ -341,15 +443,73 @@ class HomeCategoryListGroupAdmin(admin.ModelAdmin):
             return result
 
         clone_from = form.cleaned_data["clone_from"]
-        clone_from.clone_list(obj)
+        job = enqueue_job(
+            HomeCategoryListGroupJobKind.CLONE,
+            obj,
+            request.user,
+            source_id=clone_from.pk,
+        )
+        self.message_job(request, job, "복제가 끝날 때까지 이 그룹의 fwf_id 에는 기본 그룹이 응답됩니다. ")
         return result
 
     def delete_model(self, request, obj):
-        obj.delete_list()
-        return super(HomeCategoryListGroupAdmin, self).delete_model(request, obj)
+        # 목록이 큰 그룹도 요청이 끝날 때까지 기다리지 않도록 작업으로 삭제합니다.
+        job = enqueue_job(HomeCategoryListGroupJobKind.DELETE, obj, request.user)
+        self.message_job(request, job, "목록 그룹은 작업이 끝나면 삭제됩니다. ", messages.INFO)
+        request.delete_jobs_queued = True
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset.exclude(is_default=True):
+            self.delete_model(request, obj)
 
     class Media:
         js = ("/media/js/backend/form.js",)
 
 
 admin.site.register(HomeCategoryListGroup, HomeCategoryListGroupAdmin)
+
+
+class HomeCategoryListGroupJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "list_group_name",
+        "state",
+        "progress_bar",
+        "created_by",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
+    list_filter = ("kind", "state")
+    list_select_related = ("created_by",)
+    fields = (
+        "kind",
+        "list_group_name",
+        "state",
+        "progress_bar",
+        "params",
+        "result",
+        "error",
+        "created_by",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
+    readonly_fields = fields
+
+    def progress_bar(self, obj):
+        return format_html(
+            '<progress value="{0}" max="100"></progress> {0}%', obj.progress
+        )
+
+    progress_bar.short_description = "진행률"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(HomeCategoryListGroupJob, HomeCategoryListGroupJobAdmin)
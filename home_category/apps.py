@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HomeCategoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "home_category"
+
+    def ready(self):
+        from home_category import signals  # noqa: F401
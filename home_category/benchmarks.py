@@ -0,0 +1,336 @@
+import json
+import os
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from helpers.consts import S3_REVIEW_IMAGE_BUCKET_STORAGE
+from helpers.s3 import get_s3_review_image_bucket_url
+from home_category.events import event_image_index
+from home_category.models import (HomeCategory, HomeCategoryFetchType,
+                                  HomeCategoryImage, HomeCategoryListGroup,
+                                  HomeCategoryType)
+from home_category.payloads import compile_snapshots
+from home_category.serializers import serialize_home_categories
+from home_category.uploads import (UploadTask, content_addressed_path,
+                                   upload_files)
+
+BENCHMARK_UPLOAD_DIR = "home_categories/benchmark"
+BENCHMARK_FWF_ID = "benchmark-serializers"
+
+
+class BenchmarkResult:
+    __slots__ = ("name", "rounds", "best", "mean", "peak_kib", "queries")
+
+    def __init__(self, name, timings, peak_kib, queries):
+        self.name = name
+        self.rounds = len(timings)
+        self.best = min(timings)
+        self.mean = sum(timings) / len(timings)
+        self.peak_kib = peak_kib
+        self.queries = queries
+
+    def __str__(self):
+        return (
+            "{:<40} best {:>9.3f} ms  mean {:>9.3f} ms  "
+            "peak {:>9.1f} KiB  {:>4} queries  ({} rounds)"
+        ).format(
+            self.name,
+            self.best * 1000,
+            self.mean * 1000,
+            self.peak_kib,
+            self.queries,
+            self.rounds,
+        )
+
+
+def measure(name, func, rounds):
+    """Times `rounds` calls of `func`, then runs it once more under tracemalloc and
+    query capture for the allocation peak and the SQL query count."""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as captured:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(name, timings, peak / 1024, len(captured))
+
+
+def _prefetched(model, objs):
+    # prefetch_related 가 채우는 것과 같은 형태로 결과가 채워진 QuerySet
+    qs = model.objects.all()
+    qs._result_cache = list(objs)
+    qs._prefetch_done = True
+    return qs
+
+
+def build_category_list(count, children=3, images=9, now=None):
+    """Builds unsaved categories whose prefetch caches hold every sub-category and
+    image unfiltered and in insertion order, the way the legacy `to_dict` received
+    them. Every fourth category is a function category, and every third one has an
+    event image that is active at `now`, and the next one an expired event image.
+    The last sub-category is soft-deleted, sub-category priorities run backwards and
+    every fifth category has an image without a file."""
+    now = now or timezone.now()
+    item_list = []
+    pk = 0
+    for index in range(count):
+        pk += 1
+        item = HomeCategory(
+            pk=pk,
+            display_name="카테고리{}".format(index),
+            code="category-{}".format(index),
+            priority=index + 1,
+            category_type=(
+                HomeCategoryType.FUNCTION.value
+                if index % 4 == 0
+                else HomeCategoryType.DEFAULT.value
+            ),
+            fetch_type=HomeCategoryFetchType.CLASSIC.value,
+            fetch_url="/api/v1/restaurants/?category={}".format(index),
+            ga_name="category_{}".format(index),
+            restaurant_category_slug="slug-{}".format(index),
+            restaurant_category_type="type-{}".format(index),
+            bg_color="#FFFFFF",
+        )
+        sub_items = []
+        for child in range(children):
+            pk += 1
+            sub_items.append(
+                HomeCategory(
+                    pk=pk,
+                    parent_category_id=item.pk,
+                    display_name="하위{}".format(child),
+                    code="category-{}-{}".format(index, child),
+                    priority=children - child,
+                    fetch_type=HomeCategoryFetchType.SEARCH.value,
+                    fetch_url="/api/v1/search/?keyword={}".format(child),
+                    ga_name="sub_{}_{}".format(index, child),
+                    is_deleted=child == children - 1,
+                )
+            )
+        image_list = [
+            HomeCategoryImage(
+                pk=pk * 100 + position,
+                home_category_id=item.pk,
+                image_url="home_categories/images/{}_{}.png".format(index, position),
+                created_at=now - timedelta(days=30, minutes=images - position),
+            )
+            for position in range(images)
+        ]
+        if index % 3 == 0:
+            image_list.append(
+                HomeCategoryImage(
+                    pk=pk * 100 + images,
+                    home_category_id=item.pk,
+                    image_url="home_categories/images/{}_event.png".format(index),
+                    created_at=now - timedelta(days=1),
+                    is_event=True,
+                    event_starts_at=now - timedelta(hours=1),
+                    event_ends_at=now + timedelta(hours=1),
+                )
+            )
+        elif index % 3 == 1:
+            image_list.append(
+                HomeCategoryImage(
+                    pk=pk * 100 + images,
+                    home_category_id=item.pk,
+                    image_url="home_categories/images/{}_expired.png".format(index),
+                    created_at=now - timedelta(days=2),
+                    is_event=True,
+                    event_starts_at=now - timedelta(days=2),
+                    event_ends_at=now - timedelta(days=1),
+                )
+            )
+        if index % 5 == 0:
+            image_list.append(
+                HomeCategoryImage(
+                    pk=pk * 100 + images + 1,
+                    home_category_id=item.pk,
+                    image_url="",
+                    created_at=now - timedelta(days=40),
+                )
+            )
+        item._prefetched_objects_cache = {
+            "homecategory_set": _prefetched(HomeCategory, sub_items),
+            "image_set": _prefetched(HomeCategoryImage, image_list),
+        }
+        item_list.append(item)
+    return item_list
+
+
+def dumps(value):
+    return json.dumps(
+        value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def save_category_list(item_list, list_group):
+    """Inserts categories built by `build_category_list` into `list_group` with new
+    pks, keeping the `created_at` of their images."""
+    child_list = [child for item in item_list for child in item.homecategory_set.all()]
+    image_list = [img for item in item_list for img in item.image_set.all()]
+    created_at = [img.created_at for img in image_list]
+
+    source_ids = [item.pk for item in item_list]
+    for item in item_list:
+        item.pk = None
+        item.list_group_id = list_group.pk
+    HomeCategory.objects.bulk_create(item_list)
+    saved_ids = dict(zip(source_ids, (item.pk for item in item_list)))
+
+    for child in child_list:
+        child.pk = None
+        child.list_group_id = list_group.pk
+        child.parent_category_id = saved_ids[child.parent_category_id]
+    HomeCategory.objects.bulk_create(child_list)
+
+    for img in image_list:
+        img.pk = None
+        img.home_category_id = saved_ids[img.home_category_id]
+    HomeCategoryImage.objects.bulk_create(image_list)
+    # bulk_create 에서 auto_now_add 가 덮어쓴 created_at 을 되돌립니다.
+    for img, value in zip(image_list, created_at):
+        img.created_at = value
+    HomeCategoryImage.objects.bulk_update(image_list, ["created_at"])
+
+
+def benchmark_serializers(count, rounds=20):
+    """Compares the legacy per-row `to_dict` on `count` unfiltered categories with
+    `serialize_home_categories` on `fetch_active_list` of the same rows, which are
+    inserted in a transaction that is rolled back. Raises AssertionError when their
+    JSON output differs."""
+    now = timezone.now()
+    item_list = build_category_list(count, now=now)
+
+    with transaction.atomic():
+        list_group = HomeCategoryListGroup.objects.create(
+            name="benchmark", fwf_id=BENCHMARK_FWF_ID
+        )
+        save_category_list(build_category_list(count, now=now), list_group)
+        fetched_list = list(
+            HomeCategory.fetch_active_list(list_group=list_group.pk, now=now)
+        )
+        transaction.set_rollback(True)
+
+    expected = dumps([item.to_dict(now=now) for item in item_list])
+    actual = dumps(serialize_home_categories(fetched_list))
+    if expected != actual:
+        raise AssertionError("serialize_home_categories output differs from to_dict")
+
+    return [
+        measure(
+            "to_dict x {}".format(count),
+            lambda: [item.to_dict(now=now) for item in item_list],
+            rounds,
+        ),
+        measure(
+            "serialize_home_categories x {}".format(count),
+            lambda: serialize_home_categories(fetched_list),
+            rounds,
+        ),
+    ]
+
+
+def benchmark_read_path(list_group, rounds=20):
+    """Measures each step of the home category read path against the rows of
+    `list_group` (see `home_category.synthetic.generate_home_categories`)."""
+    now = timezone.now()
+
+    def fetch():
+        return list(HomeCategory.fetch_active_list(list_group=list_group.pk, now=now))
+
+    def compile_():
+        event_image_index.clear()
+        return compile_snapshots(list_group.pk, list_group.generation, now)
+
+    item_list = fetch()
+    image_names = [
+        img.image_url.name for item in item_list for img in item.image_set.all()
+    ]
+    return [
+        measure("fetch_active_list", fetch, rounds),
+        measure(
+            "_filter_images",
+            lambda: [list(item._filter_images(now)) for item in item_list],
+            rounds,
+        ),
+        measure(
+            "to_dict",
+            lambda: [item.to_dict(now=now) for item in item_list],
+            rounds,
+        ),
+        measure(
+            "serialize_home_categories",
+            lambda: serialize_home_categories(item_list),
+            rounds,
+        ),
+        measure(
+            "get_s3_review_image_bucket_url x {}".format(len(image_names)),
+            lambda: [get_s3_review_image_bucket_url(name) for name in image_names],
+            rounds,
+        ),
+        measure("compile_snapshots (cold)", compile_, rounds),
+    ]
+
+
+def benchmark_admin_changelist(client, list_group, rounds=5):
+    """Measures the HomeCategory admin changelist of `list_group`. `client` must be
+    logged in as a staff user."""
+    path = "{}?list_group__id__exact={}".format(
+        reverse("admin:home_category_homecategory_changelist"), list_group.pk
+    )
+
+    def changelist():
+        response = client.get(path)
+        assert response.status_code == 200, response.status_code
+
+    return [measure("admin changelist", changelist, rounds)]
+
+
+def benchmark_uploads(count, size, rounds=3):
+    """Measures `upload_files` of `count` new files of `size` bytes to
+    `S3_REVIEW_IMAGE_BUCKET_STORAGE`. `REVIEW_IMAGE_S3_ENDPOINT_URL` must point to a
+    local S3 stand-in, and the uploaded files are deleted after measuring. Every call
+    uploads different content, so no file is skipped as already stored."""
+    if not settings.REVIEW_IMAGE_S3_ENDPOINT_URL:
+        raise ImproperlyConfigured(
+            "REVIEW_IMAGE_S3_ENDPOINT_URL 에 로컬 S3 를 지정해야 업로드를 측정할 수 있습니다."
+        )
+    body = bytes(size - 16)
+    uploaded = []
+
+    def upload():
+        tasks = []
+        for _ in range(count):
+            file = ContentFile(os.urandom(16) + body, name="benchmark.png")
+            tasks.append(
+                UploadTask(content_addressed_path(BENCHMARK_UPLOAD_DIR, file), file)
+            )
+        uploaded.extend(upload_files(tasks))
+
+    try:
+        return [
+            measure(
+                "upload_files {} x {} KiB".format(count, size // 1024), upload, rounds
+            )
+        ]
+    finally:
+        for path in uploaded:
+            S3_REVIEW_IMAGE_BUCKET_STORAGE.delete(path)
@@ -1,3 +1,27 @@
+LIST_GROUP_ID_CACHE_KEY = "home_category:list_group_id:{}"
+GENERATION_CACHE_KEY = "home_category:generation:{}"
+MANIFEST_CACHE_KEY = "home_category:manifest:{}:{}"
+PAYLOAD_CACHE_KEY = "home_category:payload:{}:{}:{}"
+
+# FunctionalCategoryImagesPositions 의 개수
+FUNCTION_CATEGORY_IMG_COUNT = 9
+
+# HOME_CATEGORY_ADMIN_NOTICE 의 이미지 사이즈 (width, height)
+HOME_CATEGORY_ICON_IMAGE_SIZES = frozenset(
+    [
+        (204, 204),
+        (192, 45),
+        (252, 135),
+        (486, 99),
+        (234, 168),
+        (273, 273),
+        (258, 300),
+        (228, 108),
+    ]
+)
+HOME_CATEGORY_ICON_IMAGE_FORMATS = frozenset(["png"])
+HOME_CATEGORY_ICON_IMAGE_MAX_BYTES = 1024 * 1024
+
 HOME_CATEGORY_ADMIN_NOTICE = """
 <strong>[ 이미지 사이즈 ]</strong><br>
 - 아이콘 이미지 : 204 x 204<br>
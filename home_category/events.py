@@ -0,0 +1,90 @@
+from bisect import bisect_right
+from datetime import timedelta
+
+from home_category.models import HomeCategoryImage
+
+EVENT_END_RESOLUTION = timedelta(microseconds=1)
+
+
+class EventTimeline:
+    """Event image windows of one list group, indexed for point-in-time lookups.
+
+    `HomeCategory._filter_images` shows an event image while
+    `event_starts_at <= now <= event_ends_at`, which is the half-open interval
+    `[event_starts_at, event_ends_at + 1µs)`. The interval end points are kept sorted,
+    together with the set of images active between each pair of consecutive points,
+    so both lookups are a single bisect."""
+
+    def __init__(self, generation, intervals):
+        self.generation = generation
+        self._points = []
+        self._active_sets = []
+
+        changes = {}
+        for image_id, starts_at, ends_at in intervals:
+            stops_at = ends_at + EVENT_END_RESOLUTION
+            if starts_at >= stops_at:
+                continue
+            changes.setdefault(starts_at, []).append((image_id, True))
+            changes.setdefault(stops_at, []).append((image_id, False))
+
+        active = set()
+        for point in sorted(changes):
+            for image_id, starts in changes[point]:
+                if starts:
+                    active.add(image_id)
+                else:
+                    active.discard(image_id)
+            self._points.append(point)
+            self._active_sets.append(frozenset(active))
+
+    def active_at(self, when):
+        """Returns the ids of the event images shown at `when`."""
+        index = bisect_right(self._points, when) - 1
+        if index < 0:
+            return frozenset()
+        return self._active_sets[index]
+
+    def next_transition(self, after):
+        """Returns the first moment after `after` at which `active_at` changes."""
+        index = bisect_right(self._points, after)
+        if index == len(self._points):
+            return None
+        return self._points[index]
+
+
+class EventImageIndex:
+    """Process-local `EventTimeline` per list group.
+
+    A timeline is rebuilt from the database only when the generation of its list group
+    moves, so a write to one group does not reload the event images of the others."""
+
+    def __init__(self):
+        self._timelines = {}
+
+    def timeline(self, list_group_id, generation):
+        timeline = self._timelines.get(list_group_id)
+        if timeline is None or timeline.generation != generation:
+            timeline = EventTimeline(generation, self._load(list_group_id))
+            self._timelines[list_group_id] = timeline
+        return timeline
+
+    def clear(self):
+        self._timelines.clear()
+
+    @staticmethod
+    def _load(list_group_id):
+        return (
+            HomeCategoryImage.objects.filter(
+                home_category__list_group_id=list_group_id,
+                home_category__is_deleted=False,
+                is_event=True,
+                event_starts_at__isnull=False,
+                event_ends_at__isnull=False,
+            )
+            .exclude(image_url="")
+            .values_list("pk", "event_starts_at", "event_ends_at")
+        )
+
+
+event_image_index = EventImageIndex()
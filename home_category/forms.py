@@ -1,20 +1,19 @@
-from datetime import datetime
-
 from django import forms
 from django.contrib.admin.widgets import AdminSplitDateTime
 from django.forms.models import BaseInlineFormSet
-from dowant.halpers.enums import StrLabelPairEnum
-from dowant.home_category.consts import FUNCTION_CATEGORY_IMG_COUNT
-from dowant.home_category.helpers import (
-    validate_home_category_icon_image_filesize,
-    validate_home_category_icon_image_filetype,
-    validate_home_category_icon_image_size,
-    validate_home_category_icon_lottie_filetype)
-from dowant.settings.s3utils import upload_image_to_s3
 
+from helpers.enums import StrLabelPairEnum
+from home_category.consts import FUNCTION_CATEGORY_IMG_COUNT
+from home_category.helpers import (minify_home_category_lottie,
+                                   validate_home_category_icon_image_filesize,
+                                   validate_home_category_icon_image_filetype,
+                                   validate_home_category_icon_image_size,
+                                   validate_home_category_icon_lottie_filetype)
 from home_category.models import (HomeCategory, HomeCategoryFetchType,
                                   HomeCategoryImage, HomeCategoryListGroup,
                                   HomeCategoryType)
+from home_category.uploads import (ImageUploadError, UploadTask,
+                                   content_addressed_path, upload_files)
 
 
 class HomeCategoryClassicDeliveryType(StrLabelPairEnum):
@@ -130,6 +129,7 @@ class HomeCategoryForm(forms.ModelForm):
 
     class Meta:
         model = HomeCategory
+        fields = "__all__"
 
 
 class HomeCategoryImageForm(forms.ModelForm):
@@ -138,7 +138,8 @@ class HomeCategoryImageForm(forms.ModelForm):
         choices=HomeCategoryImageType.choices(),
         required=False,
     )
-    image_file = forms.ImageField(
+    # ImageField 는 Pillow 로 이미지 전체를 디코딩하므로, 헤더만 읽는 validator 로 검사합니다.
+    image_file = forms.FileField(
         label="새로운 이미지 파일",
         required=False,
     )
@@ -164,11 +165,13 @@ class HomeCategoryImageForm(forms.ModelForm):
         if field_file and file_:
             try:
                 if image_type == HomeCategoryImageType.IMAGE.value:
-                    validate_home_category_icon_image_filetype(field_file)
                     validate_home_category_icon_image_filesize(field_file)
+                    validate_home_category_icon_image_filetype(field_file)
                     validate_home_category_icon_image_size(field_file)
                 else:
                     validate_home_category_icon_lottie_filetype(field_file)
+                    # 앱이 내려받는 크기를 줄이기 위해 압축된 파일을 올립니다.
+                    field_file = file_ = minify_home_category_lottie(field_file)
             except forms.ValidationError as err:
                 self._errors.setdefault(image_type, self.error_class()).extend(
                     self.error_class(err.messages),
@@ -182,6 +185,7 @@ class HomeCategoryImageForm(forms.ModelForm):
 
     class Meta:
         model = HomeCategoryImage
+        fields = "__all__"
 
 
 class EventHomeCategoryImageForm(HomeCategoryImageForm):
@@ -251,6 +255,48 @@ class HomeCategoryImageInlineFormset(BaseInlineFormSet):
         # changed_data는 항상 image_type을 포함하고 있어, 실질적으로 변경되지 않은 form를 구분하기 위함
         return not (len(changed_data) == 1 and changed_data[0] == "image_type")
 
+    def full_clean(self):
+        super(HomeCategoryImageInlineFormset, self).full_clean()
+        # 검증을 모두 통과한 뒤, 저장하기 전에 모든 파일을 동시에 올립니다.
+        # 업로드가 하나라도 실패하면 해당 폼의 오류로 보여주고 아무것도 저장하지 않습니다.
+        if self.is_bound and not any(self.errors) and not self.non_form_errors():
+            self._upload_images()
+
+    def _upload_images(self):
+        form_list = [
+            form
+            for form in self.forms
+            if form.files.get("{}-image_url".format(form.prefix))
+            and not (self.can_delete and self._should_delete_form(form))
+        ]
+        task_list = [self._upload_task(form) for form in form_list]
+        try:
+            s3_path_list = upload_files(task_list)
+        except ImageUploadError as err:
+            for form, task in zip(form_list, task_list):
+                if task.path == err.path:
+                    form.add_error(
+                        form.cleaned_data.get("image_type") or None,
+                        "파일을 올리지 못했습니다. 잠시 후 다시 시도해주세요. ({})".format(err),
+                    )
+            return
+
+        for form, s3_path in zip(form_list, s3_path_list):
+            form.uploaded_image_url = s3_path
+
+    @staticmethod
+    def _upload_task(form):
+        image = form.files.get("{}-image_url".format(form.prefix))
+        image_type = (
+            HomeCategoryImageType.IMAGE
+            if image.content_type == "image/png"
+            else HomeCategoryImageType.LOTTIE
+        )
+        return UploadTask(
+            content_addressed_path(HOME_CATEGORY_ICON_UPLOAD_DIRS[image_type], image),
+            image,
+        )
+
     def save_new_objects(self, commit=True):
         self.new_objects = []
         for form in self.extra_forms:
@@ -280,22 +326,9 @@ class HomeCategoryImageInlineFormset(BaseInlineFormSet):
 
     @staticmethod
     def _save_home_category_image(form, obj, commit):
-        image = form.files.get("{}-image_url".format(form.prefix))
-
-        if image:
-            image_type = (
-                HomeCategoryImageType.IMAGE
-                if image.content_type == "image/png"
-                else HomeCategoryImageType.LOTTIE
-            )
-            filename = "{:%Y%m%d%H%M%S%f}_{}".format(
-                datetime.now(),
-                image.name,
-            )
-            s3_path = upload_image_to_s3(
-                HOME_CATEGORY_ICON_UPLOAD_DIRS[image_type], image, filename
-            )
-            obj.image_url = s3_path
+        uploaded_image_url = getattr(form, "uploaded_image_url", None)
+        if uploaded_image_url:
+            obj.image_url = uploaded_image_url
 
         if commit:
             obj.save()
@@ -329,3 +362,4 @@ class HomeCategoryListGroupForm(forms.ModelForm):
 
     class Meta:
         model = HomeCategoryListGroup
+        fields = "__all__"
@@ -0,0 +1,65 @@
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from helpers.images import ImageHeaderError, read_image_info
+from helpers.lottie import LottieError, minify_lottie
+from home_category.consts import (HOME_CATEGORY_ICON_IMAGE_FORMATS,
+                                  HOME_CATEGORY_ICON_IMAGE_MAX_BYTES,
+                                  HOME_CATEGORY_ICON_IMAGE_SIZES)
+
+LOTTIE_FILE_EXTENSION = ".json"
+
+
+def _read_icon_image_info(field_file):
+    try:
+        return read_image_info(field_file)
+    except ImageHeaderError:
+        raise forms.ValidationError("이미지 파일을 읽을 수 없습니다.")
+
+
+def validate_home_category_icon_image_filetype(field_file):
+    image_format = _read_icon_image_info(field_file).format
+    if image_format not in HOME_CATEGORY_ICON_IMAGE_FORMATS:
+        raise forms.ValidationError(
+            "{} 파일만 등록할 수 있습니다. (현재 파일: {})".format(
+                ", ".join(sorted(HOME_CATEGORY_ICON_IMAGE_FORMATS)).upper(),
+                image_format.upper(),
+            )
+        )
+
+
+def validate_home_category_icon_image_filesize(field_file):
+    if field_file.size > HOME_CATEGORY_ICON_IMAGE_MAX_BYTES:
+        raise forms.ValidationError(
+            "이미지 파일은 {}KB 이하여야 합니다.".format(HOME_CATEGORY_ICON_IMAGE_MAX_BYTES // 1024)
+        )
+
+
+def validate_home_category_icon_image_size(field_file):
+    info = _read_icon_image_info(field_file)
+    if (info.width, info.height) not in HOME_CATEGORY_ICON_IMAGE_SIZES:
+        raise forms.ValidationError(
+            "이미지 사이즈 ({} x {}) 가 올바르지 않습니다. 안내된 사이즈로 등록해주세요.".format(
+                info.width, info.height
+            )
+        )
+
+
+def validate_home_category_icon_lottie_filetype(field_file):
+    if not field_file.name.lower().endswith(LOTTIE_FILE_EXTENSION):
+        raise forms.ValidationError("Lottie 는 JSON 파일만 등록할 수 있습니다.")
+
+
+def minify_home_category_lottie(field_file):
+    """Validates the uploaded Lottie file and returns its minified copy to upload."""
+    try:
+        content = minify_lottie(
+            field_file,
+            settings.HOME_CATEGORY_LOTTIE_MAX_BYTES,
+            settings.HOME_CATEGORY_LOTTIE_MAX_DEPTH,
+            settings.HOME_CATEGORY_LOTTIE_FLOAT_PRECISION,
+        )
+    except LottieError as err:
+        raise forms.ValidationError("올바른 Lottie JSON 파일이 아닙니다: {}".format(err))
+    return SimpleUploadedFile(field_file.name, content, "application/json")
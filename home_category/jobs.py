@@ -0,0 +1,237 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from home_category.models import (HomeCategory, HomeCategoryListGroup,
+                                  HomeCategoryListGroupJob,
+                                  HomeCategoryListGroupJobKind,
+                                  HomeCategoryListGroupJobState)
+from home_category.payloads import invalidate_list_group_alias
+from home_category.sync import sync_list_groups
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.HOME_CATEGORY_JOB_WORKERS,
+    thread_name_prefix="home-category-job",
+)
+
+# 이 프로세스의 풀에 넘긴 작업과 그중 실행 중인 작업
+_submitted_job_ids = set()
+_running_job_ids = set()
+_job_ids_lock = threading.Lock()
+_runner_pid = None
+
+# heartbeat 가 이만큼 끊긴 실행 중 작업은 프로세스가 종료된 것으로 봅니다.
+STALE_HEARTBEAT_INTERVALS = 3
+
+
+def list_group_label(list_group):
+    return "{0.name} ({0.fwf_id})".format(list_group)
+
+
+def enqueue_job(kind, list_group, created_by=None, **params):
+    """Saves a queued job and hands it to the worker pool once the current transaction
+    commits, so the worker sees the rows the caller just wrote."""
+    job = HomeCategoryListGroupJob.objects.create(
+        kind=kind.value,
+        list_group=list_group,
+        list_group_name=list_group_label(list_group),
+        params=params,
+        created_by=created_by,
+    )
+    transaction.on_commit(lambda: submit_job(job.pk))
+    return job
+
+
+def submit_job(job_id):
+    with _job_ids_lock:
+        if job_id in _submitted_job_ids:
+            return
+        _submitted_job_ids.add(job_id)
+    # 작업을 실행하는 프로세스만 heartbeat 를 보냅니다.
+    start_job_runner()
+    executor.submit(_run_in_worker, job_id)
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        with _job_ids_lock:
+            _submitted_job_ids.discard(job_id)
+        # 풀의 스레드는 요청 사이클 밖에 있어서 연결을 직접 닫아야 합니다.
+        connections.close_all()
+
+
+def start_job_runner():
+    """Starts, once per process, the thread that keeps the heartbeat of the jobs this
+    process runs. Called when the process is handed its first job."""
+    if not _claim_runner():
+        return
+    threading.Thread(
+        target=_run_periodically,
+        args=(False,),
+        name="home-category-job-runner",
+        daemon=True,
+    ).start()
+
+
+def run_job_runner():
+    """Keeps the heartbeat of the jobs this process runs and picks up the jobs another
+    process left behind, in the calling thread and until the process is stopped."""
+    _claim_runner()
+    _run_periodically(True)
+
+
+def _claim_runner():
+    global _runner_pid
+    with _job_ids_lock:
+        if _runner_pid == os.getpid():
+            return False
+        _runner_pid = os.getpid()
+    return True
+
+
+def _run_periodically(reclaim):
+    while True:
+        time.sleep(settings.HOME_CATEGORY_JOB_HEARTBEAT_INTERVAL)
+        close_old_connections()
+        try:
+            beat_running_jobs()
+            if reclaim:
+                for job_id in reclaim_jobs():
+                    submit_job(job_id)
+        except Exception:
+            # DB 가 잠시 응답하지 않아도 다음 주기에 다시 시도합니다.
+            logger.exception("home category job runner failed")
+
+
+def beat_running_jobs():
+    with _job_ids_lock:
+        job_ids = list(_running_job_ids)
+    if job_ids:
+        HomeCategoryListGroupJob.objects.filter(
+            pk__in=job_ids, state=HomeCategoryListGroupJobState.RUNNING.value
+        ).update(heartbeat_at=timezone.now())
+
+
+def reclaim_jobs(now=None):
+    """Requeues running jobs whose process stopped sending heartbeats and returns, in
+    pk order, the queued jobs that no process picked up within a heartbeat interval.
+
+    Every job is safe to run again: clone commits in one transaction and skips a group
+    it already filled, while delete and sync pick up from what is left."""
+    now = now or timezone.now()
+    interval = timedelta(seconds=settings.HOME_CATEGORY_JOB_HEARTBEAT_INTERVAL)
+    stale_before = now - STALE_HEARTBEAT_INTERVALS * interval
+    HomeCategoryListGroupJob.objects.filter(
+        Q(heartbeat_at__lt=stale_before)
+        | Q(heartbeat_at=None, started_at__lt=stale_before),
+        state=HomeCategoryListGroupJobState.RUNNING.value,
+    ).update(state=HomeCategoryListGroupJobState.QUEUED.value, progress=0)
+    return list(
+        HomeCategoryListGroupJob.objects.filter(
+            state=HomeCategoryListGroupJobState.QUEUED.value,
+            created_at__lt=now - interval,
+        )
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def run_job(job_id):
+    """Runs a queued job and stores its result or error. Does nothing when the job was
+    already picked up, so a job is never run twice."""
+    now = timezone.now()
+    if not HomeCategoryListGroupJob.objects.filter(
+        pk=job_id, state=HomeCategoryListGroupJobState.QUEUED.value
+    ).update(
+        state=HomeCategoryListGroupJobState.RUNNING.value,
+        started_at=now,
+        heartbeat_at=now,
+    ):
+        return
+
+    job = HomeCategoryListGroupJob.objects.get(pk=job_id)
+    with _job_ids_lock:
+        _running_job_ids.add(job_id)
+    try:
+        result = JOB_HANDLERS[job.kind](job)
+    except Exception:
+        HomeCategoryListGroupJob.objects.filter(pk=job_id).update(
+            state=HomeCategoryListGroupJobState.FAILED.value,
+            error=traceback.format_exc(),
+            finished_at=timezone.now(),
+        )
+        return
+    finally:
+        with _job_ids_lock:
+            _running_job_ids.discard(job_id)
+
+    HomeCategoryListGroupJob.objects.filter(pk=job_id).update(
+        state=HomeCategoryListGroupJobState.SUCCEEDED.value,
+        progress=100,
+        result=result,
+        finished_at=timezone.now(),
+    )
+    if job.kind == HomeCategoryListGroupJobKind.CLONE.value and job.list_group:
+        # 복제가 끝나기 전까지 기본 그룹으로 응답하던 fwf_id 를 이제 이 그룹으로 찾습니다.
+        invalidate_list_group_alias(job.list_group.fwf_id)
+
+
+def _clone(job):
+    source = HomeCategoryListGroup.objects.get(pk=job.params["source_id"])
+    # 복제는 한 트랜잭션으로 커밋되므로, 카테고리가 있으면 성공을 기록하기 전에 멈춘
+    # 이전 실행이 이미 복제한 것입니다.
+    if HomeCategory.objects.filter(list_group=job.list_group).exists():
+        return "{} 에서 이미 복제되어 있습니다.".format(list_group_label(source))
+    source.clone_list(job.list_group)
+    return "{} 에서 복제했습니다.".format(list_group_label(source))
+
+
+def _sync(job):
+    target_list = list(
+        HomeCategoryListGroup.objects.filter(pk__in=job.params["target_ids"]).order_by(
+            "pk"
+        )
+    )
+    names = {target.pk: list_group_label(target) for target in target_list}
+    batch_size = settings.HOME_CATEGORY_SYNC_BATCH_SIZE
+
+    lines = []
+    for start in range(0, len(target_list), batch_size):
+        for result in sync_list_groups(
+            job.list_group, target_list[start : start + batch_size]
+        ):
+            lines.append("{}: {}".format(names[result.list_group_id], result))
+        job.update_progress(min(start + batch_size, len(target_list)), len(target_list))
+    return "\n".join(lines)
+
+
+def _delete(job):
+    if job.list_group is None:
+        return "이미 삭제된 목록 그룹입니다."
+    job.list_group.delete_list(
+        chunk_size=settings.HOME_CATEGORY_DELETE_CHUNK_SIZE,
+        on_progress=job.update_progress,
+    )
+    job.list_group.delete()
+    return "삭제했습니다."
+
+
+JOB_HANDLERS = {
+    HomeCategoryListGroupJobKind.CLONE.value: _clone,
+    HomeCategoryListGroupJobKind.SYNC.value: _sync,
+    HomeCategoryListGroupJobKind.DELETE.value: _delete,
+}
@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+
+from home_category.benchmarks import (benchmark_admin_changelist,
+                                      benchmark_read_path,
+                                      benchmark_serializers, benchmark_uploads)
+from home_category.synthetic import generate_home_categories
+
+
+class Command(BaseCommand):
+    help = (
+        "홈 카테고리 응답 경로의 성능 (시간, 메모리 할당, SQL 쿼리 수) 을 측정합니다. "
+        "--database 를 지정하면 합성 데이터를 넣고 측정한 뒤 롤백합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--categories",
+            default="100,500",
+            help="쉼표로 구분한 카테고리 수",
+        )
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument(
+            "--database",
+            action="store_true",
+            help="DB 에 합성 데이터를 넣고 조회 경로와 어드민 목록까지 측정합니다",
+        )
+        parser.add_argument("--list-groups", type=int, default=10)
+        parser.add_argument("--children", type=int, default=3)
+        parser.add_argument(
+            "--uploads",
+            type=int,
+            default=0,
+            help="이미지 저장소에 올릴 파일 수 (REVIEW_IMAGE_S3_ENDPOINT_URL 의 로컬 S3 로 측정)",
+        )
+        parser.add_argument(
+            "--upload-kib", type=int, default=512, help="올릴 파일 크기 (KiB)"
+        )
+
+    def handle(self, *args, **options):
+        if options["uploads"]:
+            self._benchmark_uploads(options)
+        for count in (int(value) for value in options["categories"].split(",")):
+            self.stdout.write("== {} categories".format(count))
+            baseline, batch = benchmark_serializers(count, options["rounds"])
+            self.stdout.write(str(baseline))
+            self.stdout.write(str(batch))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "speedup x{:.2f} (identical output)".format(
+                        baseline.best / batch.best
+                    )
+                )
+            )
+            if options["database"]:
+                self._benchmark_database(count, options)
+
+    def _benchmark_uploads(self, options):
+        size = options["upload_kib"] * 1024
+        try:
+            (result,) = benchmark_uploads(options["uploads"], size, options["rounds"])
+        except ImproperlyConfigured as err:
+            raise CommandError(str(err))
+        self.stdout.write(str(result))
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{:.1f} MiB/s".format(
+                    options["uploads"] * size / result.best / 1024**2
+                )
+            )
+        )
+
+    def _benchmark_database(self, count, options):
+        with transaction.atomic():
+            list_group = generate_home_categories(
+                options["list_groups"], count, options["children"]
+            )[0]
+            list_group.refresh_from_db()
+            results = benchmark_read_path(list_group, options["rounds"])
+
+            client = Client()
+            client.force_login(
+                User.objects.create_superuser("home-category-benchmark", "", None)
+            )
+            results += benchmark_admin_changelist(client, list_group)
+
+            for result in results:
+                self.stdout.write(str(result))
+            transaction.set_rollback(True)
@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home_category.consts import FUNCTION_CATEGORY_IMG_COUNT
+from home_category.synthetic import generate_home_categories
+
+
+class Command(BaseCommand):
+    help = (
+        "부하 / 스케일 테스트용 홈 카테고리 데이터를 bulk insert 로 생성합니다. "
+        "리스트 그룹 fwf_id 는 synthetic-N 입니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--list-groups", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=30, help="그룹당 카테고리 수")
+        parser.add_argument("--children", type=int, default=3, help="카테고리당 하위 카테고리 수")
+        parser.add_argument(
+            "--images",
+            type=int,
+            default=FUNCTION_CATEGORY_IMG_COUNT,
+            help="카테고리당 이미지 수",
+        )
+        parser.add_argument(
+            "--event-every",
+            type=int,
+            default=3,
+            help="N 번째 카테고리마다 이벤트 이미지를 넣습니다 (0 이면 없음)",
+        )
+        parser.add_argument(
+            "--event-spread-days", type=int, default=7, help="이벤트 기간이 흩어지는 범위 (일)"
+        )
+        parser.add_argument(
+            "--deleted-ratio",
+            type=float,
+            default=0.1,
+            help="삭제 (is_deleted) 처리할 카테고리 비율",
+        )
+        parser.add_argument(
+            "--versioned-ratio", type=float, default=0.1, help="최소 앱 버전을 지정할 카테고리 비율"
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        for name in ("deleted_ratio", "versioned_ratio"):
+            if not 0 <= options[name] <= 1:
+                raise CommandError(
+                    "--{} 는 0 과 1 사이여야 합니다.".format(name.replace("_", "-"))
+                )
+        if options["list_groups"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--list-groups 와 --batch-size 는 1 이상이어야 합니다.")
+
+        started = time.perf_counter()
+        list_group_list = generate_home_categories(
+            options["list_groups"],
+            options["categories"],
+            options["children"],
+            images=options["images"],
+            event_every=options["event_every"],
+            event_spread_days=options["event_spread_days"],
+            deleted_ratio=options["deleted_ratio"],
+            versioned_ratio=options["versioned_ratio"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+        )
+
+        categories = len(list_group_list) * options["categories"]
+        rows = (
+            len(list_group_list)
+            + categories * (options["children"] + 1)
+            + categories * options["images"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{} ~ {}: 약 {} 행을 {:.1f} 초에 생성했습니다.".format(
+                    list_group_list[0].fwf_id,
+                    list_group_list[-1].fwf_id,
+                    rows,
+                    time.perf_counter() - started,
+                )
+            )
+        )
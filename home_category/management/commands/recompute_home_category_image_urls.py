@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from helpers.s3 import cached_s3_review_image_bucket_url
+from home_category.models import HomeCategoryImage, HomeCategoryListGroup
+
+
+class Command(BaseCommand):
+    help = (
+        "홈 카테고리 이미지에 저장된 공개 URL (full_image_url) 을 다시 계산합니다. "
+        "REVIEW_IMAGE_HOST 나 VMS_S3_FILE_URL_PREFIX 를 바꾼 뒤, "
+        "또는 URL 이 저장되지 않은 이전 이미지를 채울 때 실행합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="URL 이 저장되지 않은 이미지만 채웁니다",
+        )
+
+    def handle(self, *args, **options):
+        cached_s3_review_image_bucket_url.cache_clear()
+
+        image_qs = HomeCategoryImage.objects.exclude(image_url="").only(
+            "pk", "image_url", "full_image_url"
+        )
+        if options["missing_only"]:
+            image_qs = image_qs.filter(full_image_url="")
+
+        last_pk = 0
+        checked = updated = 0
+        while True:
+            image_list = list(
+                image_qs.filter(pk__gt=last_pk).order_by("pk")[: options["batch_size"]]
+            )
+            if not image_list:
+                break
+            last_pk = image_list[-1].pk
+            checked += len(image_list)
+
+            changed = []
+            for image in image_list:
+                full_image_url = image.resolve_full_image_url()
+                if image.full_image_url != full_image_url:
+                    image.full_image_url = full_image_url
+                    changed.append(image)
+            # save() 와 달리 modified_at 은 바꾸지 않습니다.
+            HomeCategoryImage.objects.bulk_update(changed, ["full_image_url"])
+            updated += len(changed)
+
+        if updated:
+            # 캐시된 응답에 이전 URL 이 남아 있지 않도록 모든 그룹을 무효화합니다.
+            HomeCategoryListGroup.bump_generations(
+                HomeCategoryListGroup.objects.values_list("pk", flat=True)
+            )
+        self.stdout.write("{} 개 중 {} 개의 URL 을 갱신했습니다.".format(checked, updated))
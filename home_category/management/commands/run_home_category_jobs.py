@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from home_category.jobs import run_job, run_job_runner
+from home_category.models import (HomeCategoryListGroupJob,
+                                  HomeCategoryListGroupJobState)
+
+
+class Command(BaseCommand):
+    help = (
+        "대기 중인 홈 카테고리 목록 그룹 작업을 이 프로세스에서 실행합니다. "
+        "--watch 로 띄워 두면 프로세스가 재시작되며 남겨진 작업을 계속 이어받습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requeue-running",
+            action="store_true",
+            help="진행 중으로 남아 있는 작업을 다시 대기 상태로 돌린 뒤 실행합니다",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="대기 중인 작업을 실행한 뒤 종료하지 않고 남겨진 작업을 주기적으로 이어받습니다",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_running"]:
+            HomeCategoryListGroupJob.objects.filter(
+                state=HomeCategoryListGroupJobState.RUNNING.value
+            ).update(state=HomeCategoryListGroupJobState.QUEUED.value, progress=0)
+
+        job_ids = list(
+            HomeCategoryListGroupJob.objects.filter(
+                state=HomeCategoryListGroupJobState.QUEUED.value
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        for job_id in job_ids:
+            run_job(job_id)
+            job = HomeCategoryListGroupJob.objects.get(pk=job_id)
+            self.stdout.write("{}: {}".format(job, job.get_state_display()))
+
+        if options["watch"]:
+            run_job_runner()
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from home_category.recorder import read_records
+from home_category.ttl_simulator import recommend, simulate
+
+DEFAULT_TTLS = "0,10,30,60,300,900,1800,3600"
+
+
+class Command(BaseCommand):
+    help = (
+        "기록된 홈 카테고리 응답을 후보 TTL 별로 캐시에 재생해 "
+        "시간대별 적중률, stale 구간, 절약된 DB 쿼리 수와 추천 TTL 을 출력합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log-dir",
+            default=settings.HOME_CATEGORY_RESPONSE_LOG_DIR,
+            help="record_home_category_response 가 기록한 디렉터리",
+        )
+        parser.add_argument(
+            "--ttls",
+            default=DEFAULT_TTLS,
+            help="쉼표로 구분한 후보 TTL (초)",
+        )
+        parser.add_argument(
+            "--max-stale-ratio",
+            type=float,
+            default=0.01,
+            help="추천 TTL 이 허용하는 stale 응답 비율",
+        )
+        parser.add_argument(
+            "--queries-per-miss",
+            type=int,
+            default=3,
+            help="캐시 미스 한 번에 실행되는 DB 쿼리 수 (fetch_active_list + prefetch)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["log_dir"]:
+            raise CommandError("--log-dir 를 지정해주세요.")
+        try:
+            ttls = sorted({int(ttl) for ttl in options["ttls"].split(",")})
+        except ValueError:
+            raise CommandError("--ttls 는 쉼표로 구분한 정수여야 합니다.")
+
+        records = list(read_records(str(options["log_dir"])))
+        if not records:
+            raise CommandError("기록된 응답이 없습니다: {}".format(options["log_dir"]))
+
+        stats_by_ttl = {ttl: simulate(records, ttl) for ttl in ttls}
+        hours = sorted({hour for stats in stats_by_ttl.values() for hour in stats})
+
+        self.stdout.write(
+            "{:>4} {:>6} {:>9} {:>7} {:>7} {:>10} {:>12}".format(
+                "hour", "ttl", "requests", "hit%", "stale%", "stale_sec", "saved_query"
+            )
+        )
+        for hour in hours:
+            for ttl in ttls:
+                stats = stats_by_ttl[ttl].get(hour)
+                if stats is None:
+                    continue
+                self.stdout.write(
+                    "{:>4} {:>6} {:>9} {:>7.2f} {:>7.2f} {:>10.1f} {:>12}".format(
+                        hour,
+                        ttl,
+                        stats.requests,
+                        stats.hit_ratio * 100,
+                        stats.stale_ratio * 100,
+                        stats.stale_seconds,
+                        stats.hits * options["queries_per_miss"],
+                    )
+                )
+
+        self.stdout.write("")
+        self.stdout.write("추천 TTL (시간대별)")
+        for hour in hours:
+            ttl = recommend(stats_by_ttl, hour, options["max_stale_ratio"])
+            self.stdout.write(self.style.SUCCESS("{:02d}시: {}초".format(hour, ttl)))
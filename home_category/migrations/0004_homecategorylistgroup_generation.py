@@ -0,0 +1,22 @@
+# Generated by Django 4.1 on 2026-10-17 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home_category", "0003_alter_homecategory_list_group_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="homecategorylistgroup",
+            name="generation",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="목록 그룹의 홈 카테고리가 변경될 때마다 증가하는 번호 (응답 캐시 키에 사용)",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.1 on 2026-10-17 19:07
+
+import re
+
+from django.db import migrations, models
+
+# 이 마이그레이션을 만들 때의 helpers.versions.parse_app_version 을 그대로 옮겨 둡니다.
+# 이후에 앱 코드가 바뀌어도 이 마이그레이션의 결과는 바뀌지 않습니다.
+APP_VERSION_PATTERN = re.compile(r"^\s*v?(\d+(?:\.\d+)*)")
+APP_VERSION_MIN_PARTS = 3
+
+
+def parse(value):
+    if not value:
+        return None
+    match = APP_VERSION_PATTERN.match(value)
+    if not match:
+        return []
+    parts = [int(part) for part in match.group(1).split(".")]
+    parts.extend([0] * (APP_VERSION_MIN_PARTS - len(parts)))
+    return parts
+
+
+def parse_min_required_versions(apps, schema_editor):
+    HomeCategory = apps.get_model("home_category", "HomeCategory")
+
+    for item in HomeCategory.objects.exclude(
+        min_required_ios_version__isnull=True, min_required_android_version__isnull=True
+    ).iterator():
+        item.parsed_min_required_ios_version = parse(item.min_required_ios_version)
+        item.parsed_min_required_android_version = parse(
+            item.min_required_android_version
+        )
+        item.save(
+            update_fields=[
+                "parsed_min_required_ios_version",
+                "parsed_min_required_android_version",
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home_category", "0004_homecategorylistgroup_generation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="homecategory",
+            name="parsed_min_required_android_version",
+            field=models.JSONField(blank=True, default=None, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="homecategory",
+            name="parsed_min_required_ios_version",
+            field=models.JSONField(blank=True, default=None, editable=False, null=True),
+        ),
+        migrations.RunPython(parse_min_required_versions, migrations.RunPython.noop),
+    ]
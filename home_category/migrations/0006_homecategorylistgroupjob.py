@@ -0,0 +1,109 @@
+# Generated by Django 4.1 on 2026-10-17 19:18
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("home_category", "0005_homecategory_parsed_min_required_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HomeCategoryListGroupJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("clone", "목록 복제"),
+                            ("sync", "기본 그룹과 동기화"),
+                            ("delete", "목록 그룹 삭제"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("queued", "대기 중"),
+                            ("running", "진행 중"),
+                            ("succeeded", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        db_index=True,
+                        default="queued",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "list_group_name",
+                    models.CharField(
+                        help_text="작업 대상 목록 그룹 (그룹이 삭제된 뒤에도 표시하기 위해 저장)", max_length=80
+                    ),
+                ),
+                ("params", models.JSONField(default=dict, help_text="작업 인자")),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0,
+                        help_text="진행률 (%)",
+                        validators=[django.core.validators.MaxValueValidator(100)],
+                    ),
+                ),
+                ("result", models.TextField(blank=True, default="")),
+                ("error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, default=None, null=True),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, default=None, null=True),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        default=None,
+                        help_text="작업을 등록한 사용자",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "list_group",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        help_text="작업 대상 목록 그룹 (복제는 새 그룹, 동기화는 원본 그룹)",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="job_set",
+                        to="home_category.homecategorylistgroup",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Home Category List Group Jobs",
+                "ordering": ("-pk",),
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1 on 2026-10-17 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home_category", "0006_homecategorylistgroupjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="homecategoryimage",
+            name="full_image_url",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="저장할 때 계산한 image_url 의 공개 URL",
+                max_length=500,
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1 on 2026-10-17 19:26
+
+from django.db import migrations, models
+
+import helpers.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home_category", "0007_homecategoryimage_full_image_url"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="homecategoryimage",
+            name="image_url",
+            field=models.FileField(
+                max_length=200,
+                storage=helpers.storage.S3Storage(),
+                upload_to="restaurants/detail_image",
+            ),
+        ),
+    ]
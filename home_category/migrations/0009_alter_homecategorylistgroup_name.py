@@ -0,0 +1,18 @@
+# Generated by Django 4.1 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home_category", "0008_alter_homecategoryimage_image_url_storage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="homecategorylistgroup",
+            name="name",
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home_category", "0009_alter_homecategorylistgroup_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="homecategorylistgroupjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                default=None,
+                help_text="실행 중인 프로세스가 마지막으로 살아 있음을 알린 시각",
+                null=True,
+            ),
+        ),
+    ]
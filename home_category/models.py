@@ -1,18 +1,25 @@
-from datetime import datetime
+import time
 from operator import attrgetter
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import SuspiciousOperation
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     RegexValidator)
 from django.db import models, transaction
+from django.db.models import F, Prefetch, Q
+from django.utils import timezone
 
 from helpers.consts import (DETAIL_IMAGE_S3_UPLOAD_DIR,
                             HOME_CATEGORY_UI_GUIDE_TEXT,
                             S3_REVIEW_IMAGE_BUCKET_STORAGE)
+from helpers.db import delete_where_in
 from helpers.enums import StrCodeEnum, StrLabelPairEnum
-from helpers.s3 import get_s3_review_image_bucket_url
+from helpers.s3 import (cached_s3_review_image_bucket_url,
+                        get_s3_review_image_bucket_url)
+from helpers.versions import parse_app_version
+from home_category.consts import GENERATION_CACHE_KEY
 
 
 class HomeCategoryType(StrLabelPairEnum):
@@ -60,19 +67,42 @@ class HomeCategoryGtmShopListType(StrCodeEnum):
     YGYEXPRESS = "ygyexpress"
 
 
+class HomeCategoryPlatform(StrCodeEnum):
+    IOS = "ios"
+    ANDROID = "android"
+
+
+class HomeCategoryListGroupJobKind(StrLabelPairEnum):
+    CLONE = ("clone", "목록 복제")
+    SYNC = ("sync", "기본 그룹과 동기화")
+    DELETE = ("delete", "목록 그룹 삭제")
+
+
+class HomeCategoryListGroupJobState(StrLabelPairEnum):
+    QUEUED = ("queued", "대기 중")
+    RUNNING = ("running", "진행 중")
+    SUCCEEDED = ("succeeded", "완료")
+    FAILED = ("failed", "실패")
+
+
 class HomeCategoryManager(models.Manager):
-    def get_query_set(self):
+    def get_queryset(self):
         return (
             super(HomeCategoryManager, self)
-            .get_query_set()
+            .get_queryset()
             .exclude(is_deleted=True)
             .order_by("priority")
         )
 
 
+# 프로세스에 보관한 기본 목록 그룹의 (pk, 만료 시각)
+_default_list_group_id = {}
+
+
 class HomeCategoryListGroup(models.Model):
     name = models.CharField(
         max_length=20,
+        db_index=True,
     )
     fwf_id = models.CharField(
         max_length=50,
@@ -92,42 +122,161 @@ class HomeCategoryListGroup(models.Model):
         on_delete=models.CASCADE,
         db_constraint=False,
     )
+    generation = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="목록 그룹의 홈 카테고리가 변경될 때마다 증가하는 번호 (응답 캐시 키에 사용)",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
 
-    def clone_list(self, target_list_group):
-        item_list = HomeCategory.fetch_active_list(list_group=self)
+    @classmethod
+    def bump_generation(cls, list_group_id):
+        cls.bump_generations([list_group_id])
 
-        with transaction.commit_on_success():
-            for item in item_list:
-                child_list = item.homecategory_set.all()
-                image_list = item.image_set.all()
-                cloned = item.clone(target_list_group)
+    @classmethod
+    def bump_generations(cls, list_group_ids):
+        """Invalidates compiled payloads of the list groups.
+
+        The counters are incremented inside the caller's transaction, so readers see the
+        new generation together with the committed rows; the cached copies are dropped
+        once the transaction commits."""
+        list_group_ids = [pk for pk in list_group_ids if pk is not None]
+        if not list_group_ids:
+            return
+        cls.objects.filter(pk__in=list_group_ids).update(generation=F("generation") + 1)
+        transaction.on_commit(
+            lambda: cache.delete_many(
+                [GENERATION_CACHE_KEY.format(pk) for pk in list_group_ids]
+            )
+        )
 
-                for child in child_list:
-                    child.clone(target_list_group, cloned)
+    @classmethod
+    def get_default_id(cls):
+        """Returns the pk of the default list group, kept in the process for
+        `HOME_CATEGORY_DEFAULT_LIST_GROUP_TIMEOUT` seconds.
+
+        Saving or deleting a list group drops it once the transaction commits; the
+        timeout bounds how long other processes keep a default changed elsewhere."""
+        cached = _default_list_group_id.get("pk")
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        pk = cls.objects.filter(is_default=True).values_list("pk", flat=True).first()
+        if pk is not None:
+            _default_list_group_id["pk"] = (
+                pk,
+                time.monotonic() + settings.HOME_CATEGORY_DEFAULT_LIST_GROUP_TIMEOUT,
+            )
+        return pk
+
+    @staticmethod
+    def forget_default_id():
+        _default_list_group_id.clear()
+
+    def save(self, *args, **kwargs):
+        # generation 은 bump_generations 의 F("generation") + 1 로만 바꿉니다.
+        # 오래 들고 있던 인스턴스를 저장해도 번호가 되돌아가지 않도록 UPDATE 에서 뺍니다.
+        if not self._state.adding and not kwargs.get("force_insert"):
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                update_fields = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                ]
+            kwargs["update_fields"] = [
+                name for name in update_fields if name != "generation"
+            ]
+        super(HomeCategoryListGroup, self).save(*args, **kwargs)
 
-                for image in image_list:
-                    image.clone(cloned)
+    def clone_list(self, target_list_group):
+        """Copies the active categories of this group, with their sub-categories and
+        images, into `target_list_group`.
+
+        Each table is read and bulk inserted once, whatever the size of the group; the
+        parent ids of sub-categories and images are remapped to the inserted rows."""
+        item_list = list(
+            HomeCategory.active.filter(list_group=self, parent_category=None).order_by(
+                "pk"
+            )
+        )
+        # 하위 쿼리로 다시 고르면 그 사이에 추가된 카테고리의 행이 섞일 수 있으므로
+        # 이미 읽은 id 로 고릅니다.
+        source_ids = [item.pk for item in item_list]
+        # 예약된 이벤트 이미지와 숨겨진 하위 카테고리까지 그대로 복제합니다.
+        child_list = list(
+            HomeCategory.objects.filter(parent_category_id__in=source_ids).order_by(
+                "pk"
+            )
+        )
+        # 노출 순서가 created_at 순이므로 같은 순서로 생성합니다.
+        image_list = list(
+            HomeCategoryImage.objects.filter(home_category_id__in=source_ids).order_by(
+                "created_at", "pk"
+            )
+        )
 
-    def delete_list(self):
+        for item in item_list:
+            item.pk = None
+            item.list_group_id = target_list_group.pk
+
+        with transaction.atomic():
+            HomeCategory.objects.bulk_create(item_list)
+            cloned_ids = dict(zip(source_ids, (item.pk for item in item_list)))
+
+            for child in child_list:
+                child.pk = None
+                child.list_group_id = target_list_group.pk
+                child.parent_category_id = cloned_ids[child.parent_category_id]
+            HomeCategory.objects.bulk_create(child_list)
+
+            for image in image_list:
+                image.pk = None
+                image.home_category_id = cloned_ids[image.home_category_id]
+                # 원본이 이전 이미지여도 복제본에는 공개 URL 을 채웁니다.
+                image.full_image_url = image.resolve_full_image_url()
+            HomeCategoryImage.objects.bulk_create(image_list)
+
+            HomeCategoryListGroup.bump_generation(target_list_group.pk)
+
+    def delete_list(self, chunk_size=None, on_progress=None):
+        """Deletes the categories of this group with their sub-categories and images.
+
+        Rows are removed with plain DELETE statements instead of the ORM collector, so
+        no row is loaded and no per-row delete signal is sent; the generation is bumped
+        once after the last chunk instead. With `chunk_size`, that many categories
+        (sub-categories first) are removed per transaction, so a huge group does not hold
+        its locks for long when called outside of a transaction. `on_progress(done,
+        total)` is called after each transaction."""
         if self.is_default:
             raise SuspiciousOperation(
                 "deleting default HomeCategory list is not allowed"
             )
 
-        item_list = HomeCategory.objects.filter(list_group=self)
-        child_list = HomeCategory.objects.filter(parent_category__in=item_list)
-        image_list = HomeCategoryImage.objects.filter(home_category__in=item_list)
+        category_ids = list(
+            HomeCategory.objects.filter(
+                Q(list_group=self) | Q(parent_category__list_group=self)
+            )
+            .order_by(F("parent_category_id").asc(nulls_last=True), "pk")
+            .values_list("pk", flat=True)
+        )
+        chunk_size = chunk_size or len(category_ids) or 1
 
-        with transaction.commit_on_success():
-            image_list.delete()
-            child_list.delete()
-            item_list.delete()
+        for start in range(0, max(len(category_ids), 1), chunk_size):
+            chunk = category_ids[start : start + chunk_size]
+            with transaction.atomic():
+                delete_where_in(HomeCategoryImage, "home_category", chunk)
+                delete_where_in(HomeCategory, "id", chunk)
+            if on_progress is not None:
+                on_progress(start + len(chunk), len(category_ids))
+        HomeCategoryListGroup.bump_generation(self.pk)
 
     def __unicode__(self):
         return "{0.name} ({0.fwf_id})".format(self)
 
+    __str__ = __unicode__
+
     class Meta:
         verbose_name_plural = "Home Category List Group (for A/B Test)"
 
@@ -222,6 +371,20 @@ class HomeCategory(models.Model):
         default=None,
         help_text="지원하는 최소 안드로이드 앱 버전 (x.y.z, 테스트앱 버전 등 특수 케이스에 사용)",
     )
+    # 저장 시 min_required_*_version 을 parse_app_version 으로 해석한 값.
+    # 해석할 수 없는 값은 [] 로 저장되며, 해당 플랫폼에는 노출하지 않습니다.
+    parsed_min_required_ios_version = models.JSONField(
+        null=True,
+        blank=True,
+        default=None,
+        editable=False,
+    )
+    parsed_min_required_android_version = models.JSONField(
+        null=True,
+        blank=True,
+        default=None,
+        editable=False,
+    )
     is_visible = models.BooleanField(
         default=False,
         help_text="화면 표시 여부 (체크 해제 시 화면에서 숨김)",
@@ -280,21 +443,30 @@ class HomeCategory(models.Model):
     def is_function_type(self):
         return self.category_type == HomeCategoryType.FUNCTION
 
-    def _filter_images(self):
+    def _filter_images(self, now=None, active_event_image_ids=None):
+        """`active_event_image_ids` comes from `EventTimeline.active_at(now)` when the
+        caller already has the event timeline of the list group."""
         pre_filtered = [img for img in self.image_set.all() if img.image_url]
 
-        now = datetime.now()
-        event_images = [
-            img
-            for img in pre_filtered
-            if img.is_event and img.event_starts_at <= now <= img.event_ends_at
-        ]
+        if active_event_image_ids is not None:
+            event_images = [
+                img
+                for img in pre_filtered
+                if img.is_event and img.pk in active_event_image_ids
+            ]
+        else:
+            now = now or timezone.now()
+            event_images = [
+                img
+                for img in pre_filtered
+                if img.is_event and img.event_starts_at <= now <= img.event_ends_at
+            ]
         if event_images:
             return event_images
         return (img for img in pre_filtered if not img.is_event)
 
-    def to_dict(self, fetch_url=None):
-        filtered_image_objs = self._filter_images()
+    def to_dict(self, fetch_url=None, now=None, active_event_image_ids=None):
+        filtered_image_objs = self._filter_images(now, active_event_image_ids)
         images = [
             img.get_full_image_url()
             for img in sorted(filtered_image_objs, key=attrgetter("created_at"))
@@ -312,9 +484,9 @@ class HomeCategory(models.Model):
             "is_visible": self.is_visible,
             "deeplink_code": self.deeplink_code,
             "restaurant_category_type": (
-                self.restaurant_category.category_type
+                self.restaurant_category_type
                 if self.fetch_type == HomeCategoryFetchType.CLASSIC
-                and self.restaurant_category
+                and self.restaurant_category_slug
                 else None
             ),
             "images": images,
@@ -351,6 +523,27 @@ class HomeCategory(models.Model):
             response["functional_images"]["bg_color"] = self.bg_color
         return response
 
+    @staticmethod
+    def _parse_min_required_version(value):
+        if not value:
+            return None
+        return list(parse_app_version(value) or ())
+
+    def min_required_version(self, platform):
+        """Returns the parsed minimum app version of `platform`: None when every version
+        is supported, and an empty tuple when the stored value could not be parsed."""
+        parsed = getattr(self, "parsed_min_required_{}_version".format(platform))
+        return None if parsed is None else tuple(parsed)
+
+    def save(self, *args, **kwargs):
+        self.parsed_min_required_ios_version = self._parse_min_required_version(
+            self.min_required_ios_version
+        )
+        self.parsed_min_required_android_version = self._parse_min_required_version(
+            self.min_required_android_version
+        )
+        super(HomeCategory, self).save(*args, **kwargs)
+
     def clone(self, list_group, parent_category=None):
         """Clones by mutating current `self` object. But creates a new row in DB table.
         https://docs.djangoproject.com/en/3.0/topics/db/queries/#copying-model-instances"""
@@ -365,12 +558,27 @@ class HomeCategory(models.Model):
         return "{0.display_name} ({0.code})".format(self)
 
     @classmethod
-    def fetch_active_list(cls, list_group=None, exclude_fetch_type=None):
-        # TODO: use Prefetch() for filtered & sorted prefetch after upgrading django >= 1.7 (PRE-202)
-        qs = (
-            cls.active.filter(parent_category=None)
-            .select_related("restaurant_category")
-            .prefetch_related("homecategory_set", "image_set")
+    def fetch_active_list(cls, list_group=None, exclude_fetch_type=None, now=None):
+        """Root categories of the list group with the sub-categories and images shown
+        at `now` prefetched in display order: deleted sub-categories, images without a
+        file and event images outside their window are filtered out by the database."""
+        now = now or timezone.now()
+        qs = cls.active.filter(parent_category=None).prefetch_related(
+            Prefetch(
+                "homecategory_set",
+                queryset=HomeCategory.objects.filter(is_deleted=False).order_by(
+                    "priority", "pk"
+                ),
+            ),
+            Prefetch(
+                "image_set",
+                queryset=HomeCategoryImage.objects.exclude(image_url="")
+                .filter(
+                    Q(is_event=False)
+                    | Q(event_starts_at__lte=now, event_ends_at__gte=now)
+                )
+                .order_by("created_at", "pk"),
+            ),
         )
 
         if list_group:
@@ -407,6 +615,13 @@ class HomeCategoryImage(models.Model):
         upload_to=DETAIL_IMAGE_S3_UPLOAD_DIR,
         storage=S3_REVIEW_IMAGE_BUCKET_STORAGE,
     )
+    full_image_url = models.CharField(
+        max_length=500,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="저장할 때 계산한 image_url 의 공개 URL",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
 
@@ -425,9 +640,22 @@ class HomeCategoryImage(models.Model):
         help_text="이벤트용 홈 카테고리 이미지의 종료 시간",
     )
 
-    def get_full_image_url(self):
+    def resolve_full_image_url(self):
         return get_s3_review_image_bucket_url(self.image_url.name)
 
+    def get_full_image_url(self):
+        # full_image_url 이 없는 이전 이미지는 프로세스 캐시로 계산합니다.
+        return self.full_image_url or cached_s3_review_image_bucket_url(
+            self.image_url.name
+        )
+
+    def save(self, *args, **kwargs):
+        # 새 파일은 pre_save 에서 upload_to 경로로 저장되며 이름이 정해지므로 먼저 저장한 뒤
+        # URL 을 계산합니다. 저장된 파일은 super().save() 에서 다시 올리지 않습니다.
+        self._meta.get_field("image_url").pre_save(self, self._state.adding)
+        self.full_image_url = self.resolve_full_image_url()
+        super(HomeCategoryImage, self).save(*args, **kwargs)
+
     def clone(self, home_category):
         """Clones by mutating current `self` object. But creates a new row in DB table.
         https://docs.djangoproject.com/en/3.0/topics/db/queries/#copying-model-instances"""
@@ -436,3 +664,72 @@ class HomeCategoryImage(models.Model):
         self.save()
 
         return self
+
+
+class HomeCategoryListGroupJob(models.Model):
+    """Clone, sync or delete of a list group, run by `home_category.jobs` outside of
+    the admin request."""
+
+    kind = models.CharField(
+        max_length=10,
+        choices=HomeCategoryListGroupJobKind.choices(),
+    )
+    state = models.CharField(
+        max_length=10,
+        choices=HomeCategoryListGroupJobState.choices(),
+        default=HomeCategoryListGroupJobState.QUEUED.value,
+        db_index=True,
+    )
+    list_group = models.ForeignKey(
+        HomeCategoryListGroup,
+        null=True,
+        related_name="job_set",
+        help_text="작업 대상 목록 그룹 (복제는 새 그룹, 동기화는 원본 그룹)",
+        on_delete=models.SET_NULL,
+        db_constraint=False,
+    )
+    list_group_name = models.CharField(
+        max_length=80,
+        help_text="작업 대상 목록 그룹 (그룹이 삭제된 뒤에도 표시하기 위해 저장)",
+    )
+    params = models.JSONField(default=dict, help_text="작업 인자")
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        validators=[MaxValueValidator(100)],
+        help_text="진행률 (%)",
+    )
+    result = models.TextField(blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    created_by = models.ForeignKey(
+        User,
+        null=True,
+        default=None,
+        db_index=False,
+        help_text="작업을 등록한 사용자",
+        on_delete=models.SET_NULL,
+        db_constraint=False,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, default=None, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        default=None,
+        blank=True,
+        help_text="실행 중인 프로세스가 마지막으로 살아 있음을 알린 시각",
+    )
+    finished_at = models.DateTimeField(null=True, default=None, blank=True)
+
+    def update_progress(self, done, total):
+        self.progress = 100 * done // total if total else 100
+        HomeCategoryListGroupJob.objects.filter(pk=self.pk).update(
+            progress=self.progress
+        )
+
+    def __str__(self):
+        return "{} #{} ({})".format(
+            HomeCategoryListGroupJobKind(self.kind).label, self.pk, self.list_group_name
+        )
+
+    class Meta:
+        verbose_name_plural = "Home Category List Group Jobs"
+        ordering = ("-pk",)
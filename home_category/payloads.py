@@ -0,0 +1,299 @@
+import asyncio
+import hashlib
+import json
+import math
+from bisect import bisect_right
+from collections import namedtuple
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from helpers.versions import parse_app_version
+from home_category.consts import (GENERATION_CACHE_KEY,
+                                  LIST_GROUP_ID_CACHE_KEY, MANIFEST_CACHE_KEY,
+                                  PAYLOAD_CACHE_KEY)
+from home_category.events import event_image_index
+from home_category.models import (HomeCategory, HomeCategoryListGroup,
+                                  HomeCategoryListGroupJob,
+                                  HomeCategoryListGroupJobKind,
+                                  HomeCategoryListGroupJobState,
+                                  HomeCategoryPlatform)
+from home_category.serializers import serialize_home_categories
+
+DEFAULT_LIST_GROUP_ALIAS = "__default__"
+ALL_PLATFORMS_VARIANT = "all"
+
+
+def variant_name(platform, bucket):
+    return "{}:{}".format(platform, bucket)
+
+
+class PayloadSnapshot(
+    namedtuple(
+        "PayloadSnapshot",
+        ["list_group_id", "variant", "payload", "digest", "expires_at"],
+    )
+):
+    """Home category list of a list group, already serialized to JSON bytes.
+
+    `variant` names the platform and version bucket the payload was compiled for.
+    `digest` identifies the payload contents and is served as the ETag. `expires_at`
+    is the next event image boundary of the list group (None when nothing is scheduled),
+    after which the payload no longer matches `HomeCategory.to_dict`."""
+
+    __slots__ = ()
+
+
+class PayloadManifest(
+    namedtuple("PayloadManifest", ["list_group_id", "version_boundaries", "expires_at"])
+):
+    """Index of the payload variants compiled for a list group.
+
+    `version_boundaries` maps each platform to the sorted distinct minimum app versions
+    of its categories. An app version falls into bucket `i` when exactly `i` of them are
+    less than or equal to it, and that variant holds the categories it supports."""
+
+    __slots__ = ()
+
+    def variant(self, platform=None, app_version=None):
+        boundaries = self.version_boundaries.get(platform)
+        if boundaries is None:
+            return ALL_PLATFORMS_VARIANT
+        bucket = bisect_right(boundaries, parse_app_version(app_version) or ())
+        return variant_name(platform, bucket)
+
+
+def resolve_list_group_id(fwf_id=None):
+    """Returns the pk of the list group identified by `fwf_id`.
+
+    Unknown (or empty) `fwf_id` falls back to the default list group, so clients in
+    a finished A/B test keep receiving the default home categories. So does a group
+    whose clone job has not succeeded yet, which would otherwise serve an empty or
+    partial list.
+
+    `invalidate_list_group_alias` drops the cached pk only in the cache of the
+    process that wrote, so it also expires after
+    `HOME_CATEGORY_LIST_GROUP_ID_CACHE_TIMEOUT` for processes that do not share it."""
+    alias = fwf_id or DEFAULT_LIST_GROUP_ALIAS
+    key = LIST_GROUP_ID_CACHE_KEY.format(alias)
+    list_group_id = cache.get(key)
+    if list_group_id is not None:
+        return list_group_id
+
+    list_group_id = None
+    if fwf_id:
+        list_group_id = (
+            HomeCategoryListGroup.objects.filter(fwf_id=fwf_id)
+            .exclude(
+                Exists(
+                    HomeCategoryListGroupJob.objects.filter(
+                        list_group=OuterRef("pk"),
+                        kind=HomeCategoryListGroupJobKind.CLONE.value,
+                    ).exclude(state=HomeCategoryListGroupJobState.SUCCEEDED.value)
+                )
+            )
+            .values_list("pk", flat=True)
+            .first()
+        )
+    if list_group_id is None:
+        list_group_id = (
+            HomeCategoryListGroup.objects.filter(is_default=True)
+            .values_list("pk", flat=True)
+            .first()
+        )
+    if list_group_id is not None:
+        cache.set(
+            key, list_group_id, settings.HOME_CATEGORY_LIST_GROUP_ID_CACHE_TIMEOUT
+        )
+    return list_group_id
+
+
+def invalidate_list_group_alias(fwf_id):
+    cache.delete_many(
+        [
+            LIST_GROUP_ID_CACHE_KEY.format(fwf_id),
+            LIST_GROUP_ID_CACHE_KEY.format(DEFAULT_LIST_GROUP_ALIAS),
+        ]
+    )
+
+
+def get_generation(list_group_id):
+    """Returns the generation of the list group.
+
+    The cached copy is dropped by `HomeCategoryListGroup.bump_generation`, and also
+    expires shortly so processes that do not share the cache backend catch up."""
+    key = GENERATION_CACHE_KEY.format(list_group_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = (
+            HomeCategoryListGroup.objects.filter(pk=list_group_id)
+            .values_list("generation", flat=True)
+            .first()
+        ) or 0
+        cache.set(key, generation, settings.HOME_CATEGORY_GENERATION_CACHE_TIMEOUT)
+    return generation
+
+
+def get_snapshot_timeout(snapshot, now):
+    timeout = settings.HOME_CATEGORY_PAYLOAD_CACHE_TIMEOUT
+    if snapshot.expires_at is not None:
+        seconds = math.ceil((snapshot.expires_at - now).total_seconds())
+        timeout = max(min(timeout, seconds), 1)
+    return timeout
+
+
+def _dumps(value):
+    return json.dumps(
+        value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _build_snapshots(list_group_id, item_list, timeline, now):
+    """Serializes every category once and joins the fragments into one payload per
+    (platform, version bucket) variant, plus the unfiltered `ALL_PLATFORMS_VARIANT`."""
+    active_event_image_ids = timeline.active_at(now)
+    expires_at = timeline.next_transition(now)
+    item_list = list(item_list)
+    fragments = [
+        _dumps(response)
+        for response in serialize_home_categories(item_list, active_event_image_ids)
+    ]
+
+    def snapshot(variant, variant_fragments):
+        payload = b'{"categories":[' + b",".join(variant_fragments) + b"]}"
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        return PayloadSnapshot(list_group_id, variant, payload, digest, expires_at)
+
+    snapshots = {ALL_PLATFORMS_VARIANT: snapshot(ALL_PLATFORMS_VARIANT, fragments)}
+    version_boundaries = {}
+    for platform in (e.value for e in HomeCategoryPlatform):
+        required = [item.min_required_version(platform) for item in item_list]
+        boundaries = sorted({version for version in required if version})
+        version_boundaries[platform] = boundaries
+        for bucket in range(len(boundaries) + 1):
+            supported = set(boundaries[:bucket])
+            variant = variant_name(platform, bucket)
+            snapshots[variant] = snapshot(
+                variant,
+                [
+                    fragment
+                    for fragment, version in zip(fragments, required)
+                    if version is None or version in supported
+                ],
+            )
+    return PayloadManifest(list_group_id, version_boundaries, expires_at), snapshots
+
+
+def _cache_snapshots(generation, manifest, snapshots, now):
+    list_group_id = manifest.list_group_id
+    values = {
+        PAYLOAD_CACHE_KEY.format(list_group_id, generation, variant): snapshot
+        for variant, snapshot in snapshots.items()
+    }
+    values[MANIFEST_CACHE_KEY.format(list_group_id, generation)] = manifest
+    return values, get_snapshot_timeout(manifest, now)
+
+
+def _fetch_active_list(list_group_id, now):
+    return list(HomeCategory.fetch_active_list(list_group=list_group_id, now=now))
+
+
+def compile_snapshots(list_group_id, generation, now=None):
+    now = now or timezone.now()
+    timeline = event_image_index.timeline(list_group_id, generation)
+    item_list = _fetch_active_list(list_group_id, now)
+    return _build_snapshots(list_group_id, item_list, timeline, now)
+
+
+def _get_cached_snapshot(fwf_id, platform, app_version):
+    """Returns `(list_group_id, generation, snapshot)`, where `snapshot` is None when
+    the variant of the current generation is not cached."""
+    list_group_id = resolve_list_group_id(fwf_id)
+    generation = get_generation(list_group_id)
+    manifest = cache.get(MANIFEST_CACHE_KEY.format(list_group_id, generation))
+    snapshot = None
+    if manifest is not None:
+        variant = manifest.variant(platform, app_version)
+        snapshot = cache.get(
+            PAYLOAD_CACHE_KEY.format(list_group_id, generation, variant)
+        )
+    return list_group_id, generation, snapshot
+
+
+def get_snapshot(fwf_id=None, platform=None, app_version=None):
+    """Returns the compiled snapshot for `fwf_id` matching the client platform and app
+    version, compiling every variant of the list group on a cache miss.
+
+    A compiled snapshot is kept until its list group is written to (generation bump)
+    or its next event image boundary passes, whichever comes first."""
+    list_group_id, generation, snapshot = _get_cached_snapshot(
+        fwf_id, platform, app_version
+    )
+    if snapshot is not None:
+        return snapshot
+
+    now = timezone.now()
+    manifest, snapshots = compile_snapshots(list_group_id, generation, now)
+    cache.set_many(*_cache_snapshots(generation, manifest, snapshots, now))
+    return snapshots[manifest.variant(platform, app_version)]
+
+
+def preview_snapshot(fwf_id, at, platform=None, app_version=None):
+    """Compiles the payload `fwf_id` would serve at `at` (an aware datetime), without
+    touching the payload cache."""
+    list_group_id = resolve_list_group_id(fwf_id)
+    manifest, snapshots = compile_snapshots(
+        list_group_id, get_generation(list_group_id), at
+    )
+    return snapshots[manifest.variant(platform, app_version)]
+
+
+def _in_worker_thread(func):
+    """Wraps `func` to be awaited in a thread of its own.
+
+    Thread sensitive `sync_to_async` calls, which the Django 4.1 async ORM and cache
+    use as well, all run on one shared thread, so awaiting them together does not
+    overlap the queries. The worker thread opens its own database connection for the
+    call and closes it afterwards, so idle pool threads do not hold connections."""
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+async def acompile_snapshots(list_group_id, generation, now=None):
+    now = now or timezone.now()
+    timeline, item_list = await asyncio.gather(
+        _in_worker_thread(event_image_index.timeline)(list_group_id, generation),
+        _in_worker_thread(_fetch_active_list)(list_group_id, now),
+    )
+    return _build_snapshots(list_group_id, item_list, timeline, now)
+
+
+async def aget_snapshot(fwf_id=None, platform=None, app_version=None):
+    """Async `get_snapshot` for the ASGI read path. The cache and database lookups are
+    the ones of `get_snapshot`, run in worker threads."""
+    list_group_id, generation, snapshot = await _in_worker_thread(_get_cached_snapshot)(
+        fwf_id, platform, app_version
+    )
+    if snapshot is not None:
+        return snapshot
+
+    now = timezone.now()
+    manifest, snapshots = await acompile_snapshots(list_group_id, generation, now)
+    await _in_worker_thread(cache.set_many)(
+        *_cache_snapshots(generation, manifest, snapshots, now)
+    )
+    return snapshots[manifest.variant(platform, app_version)]
@@ -0,0 +1,174 @@
+import asyncio
+import atexit
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+
+from django.conf import settings
+
+# time (unix), latency (µs), status code, payload size, list group id, payload variant
+# (ASCII, NUL padded), payload digest
+RECORD_STRUCT = struct.Struct("<dIHIQ16s16s")
+RECORD_FILE_SUFFIX = ".bin"
+
+
+class ResponseRecord(
+    namedtuple(
+        "ResponseRecord",
+        [
+            "timestamp",
+            "latency_us",
+            "status",
+            "size",
+            "list_group_id",
+            "variant",
+            "digest",
+        ],
+    )
+):
+    __slots__ = ()
+
+
+class ResponseRecorder:
+    """Append-only log of home category responses, one file per hour.
+
+    Records are packed into an in-memory buffer and written with a single `write()`
+    once the buffer is full or the hour changes, so the request path only pays for a
+    `struct.pack_into` under a lock. With `flush_interval`, a daemon thread also writes
+    the buffer every that many seconds, so a quiet worker that is killed loses at most
+    that much. Files are opened in append mode, so several worker processes can share
+    the same directory."""
+
+    def __init__(self, directory, buffer_size=64 * 1024, flush_interval=None):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._capacity = max(buffer_size // RECORD_STRUCT.size, 1)
+        self._buffer = bytearray(self._capacity * RECORD_STRUCT.size)
+        self._count = 0
+        self._hour = None
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def record(
+        self, timestamp, latency_us, status, size, list_group_id, variant, digest
+    ):
+        hour = int(timestamp // 3600)
+        with self._lock:
+            if self._count and (hour != self._hour or self._count == self._capacity):
+                self._flush()
+            self._hour = hour
+            RECORD_STRUCT.pack_into(
+                self._buffer,
+                self._count * RECORD_STRUCT.size,
+                timestamp,
+                min(latency_us, 0xFFFFFFFF),
+                status,
+                size,
+                list_group_id or 0,
+                variant.encode("ascii"),
+                digest,
+            )
+            self._count += 1
+            # fork 된 worker 에는 부모의 스레드가 없으므로 프로세스마다 시작합니다.
+            if self.flush_interval and self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(
+                    target=self._flush_periodically,
+                    name="home-category-response-recorder",
+                    daemon=True,
+                ).start()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _flush(self):
+        if not self._count:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, hour_filename(self._hour))
+        with open(path, "ab") as fp:
+            fp.write(memoryview(self._buffer)[: self._count * RECORD_STRUCT.size])
+        self._count = 0
+
+
+def hour_filename(hour):
+    return time.strftime("%Y%m%d%H", time.gmtime(hour * 3600)) + RECORD_FILE_SUFFIX
+
+
+def read_records(directory):
+    """Yields the recorded responses of every hour file in `directory`, oldest first."""
+    if not os.path.isdir(directory):
+        return
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(RECORD_FILE_SUFFIX):
+            continue
+        with open(os.path.join(directory, filename), "rb") as fp:
+            data = fp.read()
+        records = [
+            ResponseRecord(
+                *fields[:5], fields[5].rstrip(b"\0").decode("ascii"), fields[6]
+            )
+            for fields in RECORD_STRUCT.iter_unpack(
+                data[: len(data) - len(data) % RECORD_STRUCT.size]
+            )
+        ]
+        # 여러 프로세스가 버퍼 단위로 기록하므로 파일 안에서는 시간순이 아닐 수 있습니다.
+        records.sort(key=lambda record: record.timestamp)
+        yield from records
+
+
+response_recorder = None
+if settings.HOME_CATEGORY_RESPONSE_LOG_DIR:
+    response_recorder = ResponseRecorder(
+        str(settings.HOME_CATEGORY_RESPONSE_LOG_DIR),
+        flush_interval=settings.HOME_CATEGORY_RESPONSE_LOG_FLUSH_INTERVAL,
+    )
+    atexit.register(response_recorder.flush)
+
+
+def record_home_category_response(view):
+    """Records latency, size and digest of the `PayloadSnapshot` the view attached to
+    its response as `response.snapshot`."""
+    if response_recorder is None:
+        return view
+
+    def record(response, started_at, started):
+        snapshot = getattr(response, "snapshot", None)
+        if snapshot is not None:
+            response_recorder.record(
+                started_at,
+                (time.perf_counter_ns() - started) // 1000,
+                response.status_code,
+                len(response.content) if not response.streaming else 0,
+                snapshot.list_group_id,
+                snapshot.variant,
+                bytes.fromhex(snapshot.digest),
+            )
+        return response
+
+    if asyncio.iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            started_at, started = time.time(), time.perf_counter_ns()
+            response = await view(request, *args, **kwargs)
+            return record(response, started_at, started)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        started_at, started = time.time(), time.perf_counter_ns()
+        response = view(request, *args, **kwargs)
+        return record(response, started_at, started)
+
+    return wrapper
@@ -0,0 +1,83 @@
+from operator import attrgetter
+
+from helpers.consts import HOME_CATEGORY_UI_GUIDE_TEXT
+from helpers.s3 import cached_s3_review_image_bucket_url
+from home_category.models import (FunctionalCategoryImagesPositions,
+                                  HomeCategoryFetchType, HomeCategoryType)
+
+# HomeCategory.to_dict 의 공통 필드 (하위 카테고리는 이 필드만 내려갑니다)
+BASE_FIELDS = (
+    ("name", "display_name"),
+    ("list_view_type", "list_view_type"),
+    ("order_serving_type", "order_serving_type"),
+    ("fetch_type", "fetch_type"),
+    ("fetch_url", "fetch_url"),
+    ("ga_name", "ga_name"),
+    ("gtm_shop_list_type", "gtm_shop_list_type"),
+    ("code", "code"),
+    ("is_visible", "is_visible"),
+    ("deeplink_code", "deeplink_code"),
+)
+BASE_KEYS = tuple(key for key, _ in BASE_FIELDS)
+get_base_values = attrgetter(*(attr for _, attr in BASE_FIELDS))
+
+# 이미지 목록의 index 와 기능 카테고리 이미지 노출 영역의 짝 (IMAGE 영역은 제외)
+FUNCTIONAL_IMAGE_POSITIONS = tuple(
+    (index, position)
+    for index, (position, _) in enumerate(FunctionalCategoryImagesPositions.choices())
+    if position != FunctionalCategoryImagesPositions.IMAGE.value
+)
+
+
+def _select_images(item, active_event_image_ids):
+    # fetch_active_list 가 파일이 없는 이미지와 기간이 아닌 이벤트 이미지를 제외하고 created_at 순으로 가져옵니다.
+    images = item.image_set.all()
+    event_images = [
+        img
+        for img in images
+        if img.is_event
+        and (active_event_image_ids is None or img.pk in active_event_image_ids)
+    ]
+    if event_images:
+        return event_images
+    return [img for img in images if not img.is_event]
+
+
+def serialize_home_categories(item_list, active_event_image_ids=None):
+    """List-level `HomeCategory.to_dict` for the `fetch_active_list(now=now)` queryset.
+
+    The result equals `[item.to_dict(now=now, ...) for item in item_list]`. Filtering
+    and ordering of sub-categories and images is left to the prefetch queries, and the
+    position table and field getters are built at import time."""
+    classic = HomeCategoryFetchType.CLASSIC.value
+    function = HomeCategoryType.FUNCTION.value
+
+    result = []
+    for item in item_list:
+        images = [
+            img.full_image_url or cached_s3_review_image_bucket_url(img.image_url.name)
+            for img in _select_images(item, active_event_image_ids)
+        ]
+        response = dict(zip(BASE_KEYS, get_base_values(item)))
+        response["restaurant_category_type"] = (
+            item.restaurant_category_type
+            if item.fetch_type == classic and item.restaurant_category_slug
+            else None
+        )
+        response["images"] = images
+        response["sub_categories"] = [
+            dict(zip(BASE_KEYS, get_base_values(sub_item)))
+            for sub_item in item.homecategory_set.all()
+        ]
+        if item.category_type == function:
+            image_count = len(images)
+            functional_images = {
+                position: images[index]
+                for index, position in FUNCTIONAL_IMAGE_POSITIONS
+                if index < image_count
+            }
+            functional_images["guide_text"] = HOME_CATEGORY_UI_GUIDE_TEXT.get(item.code)
+            functional_images["bg_color"] = item.bg_color
+            response["functional_images"] = functional_images
+        result.append(response)
+    return result
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from home_category.models import (HomeCategory, HomeCategoryImage,
+                                  HomeCategoryListGroup)
+from home_category.payloads import invalidate_list_group_alias
+
+
+def _list_group_id_of_category(home_category_id):
+    return (
+        HomeCategory.objects.filter(pk=home_category_id)
+        .values_list("list_group_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=HomeCategoryListGroup)
+@receiver(post_delete, sender=HomeCategoryListGroup)
+def invalidate_list_group(sender, instance, **kwargs):
+    invalidate_list_group_alias(instance.fwf_id)
+    HomeCategoryListGroup.bump_generation(instance.pk)
+    transaction.on_commit(HomeCategoryListGroup.forget_default_id)
+
+
+@receiver(post_save, sender=HomeCategory)
+@receiver(post_delete, sender=HomeCategory)
+def invalidate_home_category(sender, instance, **kwargs):
+    list_group_id = instance.list_group_id
+    if list_group_id is None and instance.parent_category_id:
+        # 목록 그룹 없이 저장된 하위 카테고리는 상위 카테고리의 목록 그룹을 따릅니다.
+        list_group_id = _list_group_id_of_category(instance.parent_category_id)
+    HomeCategoryListGroup.bump_generation(list_group_id)
+
+
+@receiver(post_save, sender=HomeCategoryImage)
+@receiver(post_delete, sender=HomeCategoryImage)
+def invalidate_home_category_image(sender, instance, **kwargs):
+    HomeCategoryListGroup.bump_generation(
+        _list_group_id_of_category(instance.home_category_id)
+    )
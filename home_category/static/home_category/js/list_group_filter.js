@@ -0,0 +1,14 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // 자동완성으로 고른 목록 그룹으로 홈 카테고리 목록을 거릅니다.
+    $(function() {
+        $('#list-group-filter').on('change', function() {
+            const url = new URL(window.location.href);
+            url.searchParams.set(this.dataset.lookupKwarg, this.value);
+            url.searchParams.delete('p');
+            window.location.href = url.toString();
+        });
+    });
+}
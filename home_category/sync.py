@@ -0,0 +1,222 @@
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from helpers.db import delete_where_in
+from home_category.models import (HomeCategory, HomeCategoryImage,
+                                  HomeCategoryListGroup)
+
+# 원본 그룹에서 복사하는 필드 (attname)
+SYNCED_CATEGORY_FIELDS = tuple(
+    field.attname
+    for field in HomeCategory._meta.concrete_fields
+    if not field.primary_key
+    and field.name not in ("list_group", "parent_category", "created_at", "modified_at")
+)
+SYNCED_IMAGE_FIELDS = tuple(
+    field.attname
+    for field in HomeCategoryImage._meta.concrete_fields
+    if not field.primary_key
+    and field.name
+    not in ("home_category", "full_image_url", "created_at", "modified_at")
+)
+
+
+class ListGroupSyncResult(
+    namedtuple(
+        "ListGroupSyncResult",
+        ["list_group_id", "created", "updated", "deleted", "images_replaced"],
+    )
+):
+    """Codes of the categories changed in one target list group by
+    `sync_list_groups`. `images_replaced` lists the categories whose images were
+    replaced by copies of the source images."""
+
+    __slots__ = ()
+
+    @property
+    def has_changes(self):
+        return bool(
+            self.created or self.updated or self.deleted or self.images_replaced
+        )
+
+    def __str__(self):
+        return "생성 {} / 수정 {} / 삭제 {} / 이미지 교체 {}".format(
+            len(self.created),
+            len(self.updated),
+            len(self.deleted),
+            len(self.images_replaced),
+        )
+
+
+def _copy_fields(item, source_item, attnames):
+    for attname in attnames:
+        setattr(item, attname, getattr(source_item, attname))
+
+
+def _image_signature(image_list):
+    return [
+        tuple(getattr(image, attname) for attname in SYNCED_IMAGE_FIELDS)
+        for image in image_list
+    ]
+
+
+def _category_scope(list_group_ids, prefix=""):
+    # 하위 카테고리는 list_group 이 비어 있을 수 있어 부모의 그룹으로도 찾습니다.
+    return Q(**{prefix + "list_group__in": list_group_ids}) | Q(
+        **{prefix + "parent_category__list_group__in": list_group_ids}
+    )
+
+
+def sync_list_groups(source, target_list_groups):
+    """Makes the categories of every target list group match the active categories of
+    `source`, and returns a `ListGroupSyncResult` per target.
+
+    Categories are matched by `code`. Matched categories are updated in place, missing
+    ones are created and the ones `source` no longer has are soft-deleted. Images of a
+    category are replaced only when they differ from the source images. Each step is a
+    single set-based statement over all targets, and every changed target has its
+    generation bumped once."""
+    target_ids = [group.pk for group in target_list_groups if group.pk != source.pk]
+    if not target_ids:
+        return []
+
+    with transaction.atomic():
+        source_roots = list(
+            HomeCategory.active.filter(
+                list_group=source, parent_category=None
+            ).order_by("pk")
+        )
+        # 이미 읽은 id 로 골라야 그 사이에 추가된 카테고리의 하위 카테고리가 섞이지 않습니다.
+        source_children = list(
+            HomeCategory.objects.filter(
+                parent_category_id__in=[item.pk for item in source_roots]
+            ).order_by("pk")
+        )
+        source_codes = {item.pk: item.code for item in source_roots + source_children}
+        source_images = defaultdict(list)
+        for image in HomeCategoryImage.objects.filter(
+            home_category__in=list(source_codes)
+        ).order_by("created_at", "pk"):
+            source_images[source_codes[image.home_category_id]].append(image)
+
+        # 읽은 뒤 쓰기 전에 대상 그룹이 수정되지 않도록 대상 행을 잠급니다.
+        existing_by_group = defaultdict(dict)
+        for item in (
+            HomeCategory.objects.filter(_category_scope(target_ids))
+            .annotate(
+                target_list_group_id=Coalesce(
+                    "list_group_id", "parent_category__list_group_id"
+                )
+            )
+            .select_for_update(of=("self",))
+        ):
+            existing_by_group[item.target_list_group_id][item.code] = item
+        target_images = defaultdict(list)
+        for image in (
+            HomeCategoryImage.objects.filter(
+                _category_scope(target_ids, "home_category__")
+            )
+            .order_by("created_at", "pk")
+            .select_for_update(of=("self",))
+        ):
+            target_images[image.home_category_id].append(image)
+
+        now = timezone.now()
+        matched_by_group = {group_id: {} for group_id in target_ids}
+        created = defaultdict(list)
+        updated = defaultdict(list)
+        deleted = defaultdict(list)
+        images_replaced = defaultdict(list)
+
+        updated_items = []
+        # 하위 카테고리가 부모의 pk 를 알 수 있도록 최상위 카테고리를 먼저 만듭니다.
+        for source_list in (source_roots, source_children):
+            new_items = []
+            for group_id in target_ids:
+                existing = existing_by_group[group_id]
+                matched = matched_by_group[group_id]
+                for source_item in source_list:
+                    parent_category_id = None
+                    if source_item.parent_category_id is not None:
+                        parent_code = source_codes[source_item.parent_category_id]
+                        parent_category_id = matched[parent_code].pk
+
+                    item = existing.get(source_item.code)
+                    if item is None:
+                        item = HomeCategory(
+                            list_group_id=group_id,
+                            parent_category_id=parent_category_id,
+                        )
+                        _copy_fields(item, source_item, SYNCED_CATEGORY_FIELDS)
+                        new_items.append(item)
+                        created[group_id].append(source_item.code)
+                    elif (
+                        item.list_group_id != group_id
+                        or item.parent_category_id != parent_category_id
+                        or any(
+                            getattr(item, attname) != getattr(source_item, attname)
+                            for attname in SYNCED_CATEGORY_FIELDS
+                        )
+                    ):
+                        _copy_fields(item, source_item, SYNCED_CATEGORY_FIELDS)
+                        item.list_group_id = group_id
+                        item.parent_category_id = parent_category_id
+                        item.modified_at = now
+                        updated_items.append(item)
+                        updated[group_id].append(source_item.code)
+                    matched[source_item.code] = item
+            HomeCategory.objects.bulk_create(new_items)
+        HomeCategory.objects.bulk_update(
+            updated_items,
+            SYNCED_CATEGORY_FIELDS
+            + ("list_group_id", "parent_category_id", "modified_at"),
+        )
+
+        deleted_ids = []
+        stale_image_ids = []
+        new_images = []
+        for group_id in target_ids:
+            matched = matched_by_group[group_id]
+            for code, item in existing_by_group[group_id].items():
+                if code not in matched and not item.is_deleted:
+                    deleted_ids.append(item.pk)
+                    deleted[group_id].append(code)
+
+            for code, item in matched.items():
+                current = target_images[item.pk]
+                if _image_signature(current) == _image_signature(source_images[code]):
+                    continue
+                stale_image_ids.extend(image.pk for image in current)
+                for source_image in source_images[code]:
+                    image = HomeCategoryImage(home_category_id=item.pk)
+                    _copy_fields(image, source_image, SYNCED_IMAGE_FIELDS)
+                    # bulk_create 는 save() 를 부르지 않으므로 공개 URL 을 직접 채웁니다.
+                    image.full_image_url = image.resolve_full_image_url()
+                    new_images.append(image)
+                images_replaced[group_id].append(code)
+
+        HomeCategory.objects.filter(pk__in=deleted_ids).update(
+            is_deleted=True, modified_at=now
+        )
+        # 이미지의 post_delete 시그널은 행마다 generation 을 올리므로 보내지 않습니다.
+        delete_where_in(HomeCategoryImage, "id", stale_image_ids)
+        HomeCategoryImage.objects.bulk_create(new_images)
+
+        results = [
+            ListGroupSyncResult(
+                group_id,
+                tuple(created[group_id]),
+                tuple(updated[group_id]),
+                tuple(deleted[group_id]),
+                tuple(images_replaced[group_id]),
+            )
+            for group_id in target_ids
+        ]
+        HomeCategoryListGroup.bump_generations(
+            [result.list_group_id for result in results if result.has_changes]
+        )
+    return results
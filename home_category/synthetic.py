@@ -0,0 +1,204 @@
+import random
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from home_category.consts import (FUNCTION_CATEGORY_IMG_COUNT,
+                                  LIST_GROUP_ID_CACHE_KEY)
+from home_category.models import (HomeCategory, HomeCategoryFetchType,
+                                  HomeCategoryImage, HomeCategoryListGroup,
+                                  HomeCategoryType)
+
+SYNTHETIC_FWF_ID_PREFIX = "synthetic-"
+# 일부 카테고리에 붙는 최소 앱 버전
+MIN_REQUIRED_VERSIONS = ("6.10.0", "6.14.0", "7.0.0")
+
+
+def generate_home_categories(
+    list_groups,
+    categories,
+    children,
+    images=FUNCTION_CATEGORY_IMG_COUNT,
+    event_every=3,
+    event_spread_days=7,
+    deleted_ratio=0.0,
+    versioned_ratio=0.0,
+    now=None,
+    batch_size=1000,
+    seed=None,
+):
+    """Bulk inserts `list_groups` x `categories` root categories with `children`
+    sub-categories and `images` images each, and returns the created list groups.
+
+    Every `event_every`-th category also gets event images: one active at `now` and
+    two whose windows are spread over `event_spread_days` before and after it. About
+    `deleted_ratio` of the categories are soft-deleted and `versioned_ratio` of them
+    require a minimum app version.
+
+    Rows are inserted a few list groups at a time so memory stays bounded at any scale.
+    Signals are not sent; the new groups have no cached payload to invalidate."""
+    now = now or timezone.now()
+    rng = random.Random(seed)
+    groups_per_chunk = max(batch_size // max(categories * (children + 1), 1), 1)
+
+    with transaction.atomic():
+        offset = _next_synthetic_index()
+        list_group_list = HomeCategoryListGroup.objects.bulk_create(
+            [
+                HomeCategoryListGroup(
+                    name="synthetic {}".format(offset + index)[:20],
+                    fwf_id="{}{}".format(SYNTHETIC_FWF_ID_PREFIX, offset + index),
+                )
+                for index in range(list_groups)
+            ],
+            batch_size=batch_size,
+        )
+
+        for start in range(0, len(list_group_list), groups_per_chunk):
+            item_list = HomeCategory.objects.bulk_create(
+                [
+                    _build_category(
+                        list_group,
+                        index,
+                        is_deleted=rng.random() < deleted_ratio,
+                        min_required_version=(
+                            rng.choice(MIN_REQUIRED_VERSIONS)
+                            if rng.random() < versioned_ratio
+                            else None
+                        ),
+                    )
+                    for list_group in list_group_list[start : start + groups_per_chunk]
+                    for index in range(categories)
+                ],
+                batch_size=batch_size,
+            )
+            HomeCategory.objects.bulk_create(
+                [
+                    _build_sub_category(
+                        item, child, is_deleted=rng.random() < deleted_ratio
+                    )
+                    for item in item_list
+                    for child in range(children)
+                ],
+                batch_size=batch_size,
+            )
+            HomeCategoryImage.objects.bulk_create(
+                [
+                    image
+                    for index, item in enumerate(item_list)
+                    for image in _build_images(
+                        item,
+                        images,
+                        index % categories % event_every == 0 if event_every else False,
+                        event_spread_days,
+                        rng,
+                        now,
+                    )
+                ],
+                batch_size=batch_size,
+            )
+
+    # 같은 fwf_id 가 기본 그룹으로 캐시되어 있었을 수 있습니다.
+    cache.delete_many(
+        [LIST_GROUP_ID_CACHE_KEY.format(group.fwf_id) for group in list_group_list]
+    )
+    return list_group_list
+
+
+def _next_synthetic_index():
+    # 중간 그룹이 지워졌을 수 있으므로 개수가 아니라 가장 큰 번호 다음부터 씁니다.
+    fwf_id_list = HomeCategoryListGroup.objects.filter(
+        fwf_id__startswith=SYNTHETIC_FWF_ID_PREFIX
+    ).values_list("fwf_id", flat=True)
+    suffix_list = [
+        int(suffix)
+        for suffix in (fwf_id[len(SYNTHETIC_FWF_ID_PREFIX) :] for fwf_id in fwf_id_list)
+        if suffix.isdigit()
+    ]
+    return max(suffix_list) + 1 if suffix_list else 0
+
+
+def _build_category(list_group, index, is_deleted=False, min_required_version=None):
+    is_function = index % 5 == 0
+    item = HomeCategory(
+        list_group_id=list_group.pk,
+        display_name="카테고리{}".format(index)[:20],
+        code="category-{}".format(index),
+        priority=index % 999 + 1,
+        category_type=(
+            HomeCategoryType.FUNCTION.value
+            if is_function
+            else HomeCategoryType.DEFAULT.value
+        ),
+        fetch_type=HomeCategoryFetchType.CLASSIC.value,
+        fetch_url="/api/v1/restaurants/?category={}".format(index),
+        ga_name="category_{}".format(index),
+        is_visible=True,
+        restaurant_category_slug="slug-{}".format(index),
+        restaurant_category_type="type-{}".format(index),
+        bg_color="#FFFFFF" if is_function else None,
+        min_required_ios_version=min_required_version,
+        min_required_android_version=min_required_version,
+        is_deleted=is_deleted,
+    )
+    # bulk_create 는 save() 를 거치지 않습니다.
+    item.parsed_min_required_ios_version = item._parse_min_required_version(
+        min_required_version
+    )
+    item.parsed_min_required_android_version = item.parsed_min_required_ios_version
+    return item
+
+
+def _build_sub_category(item, child, is_deleted=False):
+    return HomeCategory(
+        list_group_id=item.list_group_id,
+        parent_category_id=item.pk,
+        display_name="하위{}".format(child),
+        code="{}-{}".format(item.code, child),
+        priority=child + 1,
+        fetch_type=HomeCategoryFetchType.SEARCH.value,
+        fetch_url="/api/v1/search/?keyword={}".format(child),
+        ga_name="{}_{}".format(item.ga_name, child),
+        is_visible=True,
+        is_deleted=is_deleted,
+    )
+
+
+def _build_image(item, image_url, **kwargs):
+    image = HomeCategoryImage(home_category_id=item.pk, image_url=image_url, **kwargs)
+    # bulk_create 는 save() 를 거치지 않습니다.
+    image.full_image_url = image.resolve_full_image_url()
+    return image
+
+
+def _build_images(item, images, has_events, event_spread_days, rng, now):
+    image_list = [
+        _build_image(
+            item, "home_categories/images/{}_{}.png".format(item.code, position)
+        )
+        for position in range(images)
+    ]
+    if not has_events:
+        return image_list
+
+    spread_hours = max(event_spread_days * 24, 2)
+    past = now - timedelta(hours=rng.randint(1, spread_hours))
+    future = now + timedelta(hours=rng.randint(1, spread_hours))
+    windows = (
+        (past - timedelta(hours=rng.randint(1, 72)), past),
+        (now - timedelta(hours=rng.randint(0, 24)), future),
+        (future, future + timedelta(hours=rng.randint(1, 72))),
+    )
+    for window, (starts_at, ends_at) in enumerate(windows):
+        image_list.append(
+            _build_image(
+                item,
+                "home_categories/images/{}_event_{}.png".format(item.code, window),
+                is_event=True,
+                event_starts_at=starts_at,
+                event_ends_at=ends_at,
+            )
+        )
+    return image_list
@@ -1,3 +1,1333 @@
-from django.test import TestCase
+import hashlib
+import importlib
+import io
+import json
+import struct
+import tempfile
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.forms import ValidationError, inlineformset_factory
+from django.test import (SimpleTestCase, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from moto import mock_aws
+
+from helpers.images import ImageHeaderError, read_image_info
+from helpers.lottie import LottieError, minify_lottie
+from helpers.s3 import cached_s3_review_image_bucket_url
+from helpers.storage import S3Storage
+from home_category.admin import HomeCategoryAdmin
+from home_category.benchmarks import (BENCHMARK_UPLOAD_DIR,
+                                      benchmark_admin_changelist,
+                                      benchmark_read_path,
+                                      benchmark_serializers, benchmark_uploads,
+                                      build_category_list, save_category_list)
+from home_category.consts import LIST_GROUP_ID_CACHE_KEY
+from home_category.events import EventTimeline, event_image_index
+from home_category.forms import (HomeCategoryImageForm,
+                                 HomeCategoryImageInlineFormset)
+from home_category.helpers import (validate_home_category_icon_image_filesize,
+                                   validate_home_category_icon_image_filetype,
+                                   validate_home_category_icon_image_size)
+from home_category.jobs import enqueue_job, reclaim_jobs, run_job
+from home_category.models import (HomeCategory, HomeCategoryImage,
+                                  HomeCategoryListGroup,
+                                  HomeCategoryListGroupJob,
+                                  HomeCategoryListGroupJobKind,
+                                  HomeCategoryListGroupJobState,
+                                  HomeCategoryType)
+from home_category.payloads import (PayloadManifest, _build_snapshots,
+                                    _cache_snapshots, get_snapshot,
+                                    resolve_list_group_id)
+from home_category.recorder import (ResponseRecord, ResponseRecorder,
+                                    read_records)
+from home_category.serializers import serialize_home_categories
+from home_category.sync import sync_list_groups
+from home_category.synthetic import generate_home_categories
+from home_category.ttl_simulator import local_hour, recommend, simulate
+from home_category.uploads import (UploadTask, content_addressed_path,
+                                   upload_files)
+
+
+class HomeCategoryListViewTest(TransactionTestCase):
+    """Calls the endpoint through the test client. The async view reads in worker
+    threads with connections of their own, so the rows have to be committed."""
+
+    def setUp(self):
+        cache.clear()
+        event_image_index.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(event_image_index.clear)
+        self.default, self.campaign = generate_home_categories(2, 3, 1, event_every=0)
+        HomeCategoryListGroup.objects.filter(pk=self.default.pk).update(is_default=True)
+        self.url = reverse("home_category:list")
+
+    def expected_categories(self, list_group):
+        return json.loads(
+            json.dumps(
+                [
+                    item.to_dict()
+                    for item in HomeCategory.fetch_active_list(list_group=list_group.pk)
+                ],
+                cls=DjangoJSONEncoder,
+            )
+        )
+
+    def test_serves_the_list_group_of_the_fwf_id(self):
+        HomeCategory.objects.filter(list_group=self.campaign, priority=1).update(
+            display_name="캠페인"
+        )
+
+        response = self.client.get(self.url, {"fwf_id": self.campaign.fwf_id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            response.json(),
+            {"categories": self.expected_categories(self.campaign)},
+        )
+        self.assertEqual(response.json()["categories"][0]["name"], "캠페인")
+
+    def test_unknown_fwf_id_falls_back_to_the_default_list_group(self):
+        default = self.client.get(self.url)
+        unknown = self.client.get(self.url, {"fwf_id": "finished-ab-test"})
+
+        self.assertEqual(unknown.status_code, 200)
+        self.assertEqual(unknown.content, default.content)
+        self.assertEqual(
+            unknown.json(), {"categories": self.expected_categories(self.default)}
+        )
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertRegex(etag, r'^"[0-9a-f]{32}"$')
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified["ETag"], etag)
+
+    def test_post_is_not_allowed(self):
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response["Allow"], "GET")
+
+    async def test_async_client(self):
+        expected = await sync_to_async(self.expected_categories)(self.campaign)
+
+        with mock.patch("home_category.payloads.connections") as connections:
+            response = await self.async_client.get(
+                self.url, {"fwf_id": self.campaign.fwf_id}
+            )
+            # alias/generation/manifest 조회, 이벤트 이미지, 카테고리, 캐시 저장
+            self.assertEqual(connections.close_all.call_count, 4)
+
+            cached = await self.async_client.get(
+                self.url, {"fwf_id": self.campaign.fwf_id}
+            )
+            self.assertEqual(connections.close_all.call_count, 5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"categories": expected})
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_saving_a_category_serves_a_new_payload(self):
+        before = self.client.get(self.url)
+
+        item = HomeCategory.objects.filter(list_group=self.default).first()
+        item.display_name = "바뀜"
+        item.save()
+
+        after = self.client.get(self.url, HTTP_IF_NONE_MATCH=before["ETag"])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after["ETag"], before["ETag"])
+        self.assertIn(
+            "바뀜", [category["name"] for category in after.json()["categories"]]
+        )
+
+
+class HomeCategoryReadPathBenchmarkTest(TestCase):
+    """Small-scale run of the benchmark suite; the query counts are asserted so that
+    an N+1 on the read path fails here instead of in production. Run
+    `manage.py benchmark_home_category --database` for timings at scale."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.list_group = generate_home_categories(2, 30, 3)[0]
+        cls.list_group.refresh_from_db()
+
+    def test_fetch_active_list_queries_do_not_grow_with_rows(self):
+        with self.assertNumQueries(3):
+            item_list = list(
+                HomeCategory.fetch_active_list(list_group=self.list_group.pk)
+            )
+        self.assertEqual(len(item_list), 30)
+
+    def test_read_path(self):
+        results = {
+            result.name.split(" x ")[0]: result
+            for result in benchmark_read_path(self.list_group, rounds=2)
+        }
+
+        self.assertEqual(results["fetch_active_list"].queries, 3)
+        self.assertEqual(results["_filter_images"].queries, 0)
+        self.assertEqual(results["to_dict"].queries, 0)
+        self.assertEqual(results["serialize_home_categories"].queries, 0)
+        self.assertEqual(results["get_s3_review_image_bucket_url"].queries, 0)
+        # event timeline + fetch_active_list
+        self.assertEqual(results["compile_snapshots (cold)"].queries, 4)
+
+    def test_serializer_output_matches_to_dict(self):
+        now = timezone.now()
+        item_list = build_category_list(15, now=now)
+        list_group = HomeCategoryListGroup.objects.create(
+            name="serializer", fwf_id="serializer"
+        )
+        save_category_list(build_category_list(15, now=now), list_group)
+        fetched_list = list(
+            HomeCategory.fetch_active_list(list_group=list_group.pk, now=now)
+        )
+
+        # to_dict 가 걸러 내던 행이 fixture 에 있어야 prefetch 의 필터까지 비교됩니다.
+        child_list = [
+            child for item in item_list for child in item.homecategory_set.all()
+        ]
+        image_list = [img for item in item_list for img in item.image_set.all()]
+        self.assertTrue(any(child.is_deleted for child in child_list))
+        self.assertTrue(
+            any(img.is_event and img.event_ends_at < now for img in image_list)
+        )
+        self.assertTrue(
+            any(img.is_event and img.event_starts_at <= now for img in image_list)
+        )
+        self.assertTrue(any(not img.image_url for img in image_list))
+
+        self.assertEqual(
+            serialize_home_categories(fetched_list),
+            [item.to_dict(now=now) for item in item_list],
+        )
+
+    def test_serializer_benchmark(self):
+        baseline, batch = benchmark_serializers(120, rounds=1)
+        self.assertGreater(baseline.peak_kib, 0)
+        self.assertGreater(batch.peak_kib, 0)
+
+    def test_admin_changelist(self):
+        self.client.force_login(
+            User.objects.create_superuser("benchmark", "benchmark@example.com", None)
+        )
+        (result,) = benchmark_admin_changelist(self.client, self.list_group, rounds=1)
+        # session, user, list group filter choices, count, page
+        self.assertEqual(result.queries, 5)
+
+    @override_settings(REVIEW_IMAGE_S3_ENDPOINT_URL=None)
+    def test_uploads_require_a_local_endpoint(self):
+        with self.assertRaises(ImproperlyConfigured):
+            benchmark_uploads(2, 1024, rounds=1)
+
+    @override_settings(REVIEW_IMAGE_S3_ENDPOINT_URL="http://localhost:9000")
+    def test_uploaded_files_are_deleted(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        storage = FileSystemStorage(location=directory.name)
+        with mock.patch(
+            "home_category.uploads.S3_REVIEW_IMAGE_BUCKET_STORAGE", storage
+        ), mock.patch(
+            "home_category.benchmarks.S3_REVIEW_IMAGE_BUCKET_STORAGE", storage
+        ):
+            (result,) = benchmark_uploads(2, 1024, rounds=1)
+
+        self.assertEqual(result.rounds, 1)
+        self.assertEqual(storage.listdir(BENCHMARK_UPLOAD_DIR), ([], []))
+
+
+class DefaultListGroupIdTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.default = HomeCategoryListGroup.objects.create(
+            name="기본", fwf_id="default", is_default=True
+        )
+
+    def setUp(self):
+        HomeCategoryListGroup.forget_default_id()
+        self.addCleanup(HomeCategoryListGroup.forget_default_id)
+
+    def test_default_id_is_kept_in_process(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(HomeCategoryListGroup.get_default_id(), self.default.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(HomeCategoryListGroup.get_default_id(), self.default.pk)
+
+    def test_saving_a_list_group_drops_the_default_id(self):
+        HomeCategoryListGroup.get_default_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.default.is_default = False
+            self.default.save()
+            other = HomeCategoryListGroup.objects.create(
+                name="새 기본", fwf_id="new-default", is_default=True
+            )
+
+        self.assertEqual(HomeCategoryListGroup.get_default_id(), other.pk)
+
+
+class ListGroupGenerationTest(TestCase):
+    def test_saving_a_stale_instance_keeps_the_generation(self):
+        list_group = HomeCategoryListGroup.objects.create(name="A", fwf_id="a")
+        stale = HomeCategoryListGroup.objects.get(pk=list_group.pk)
+        HomeCategoryListGroup.bump_generation(list_group.pk)
+        bumped = HomeCategoryListGroup.objects.get(pk=list_group.pk).generation
+
+        stale.name = "B"
+        stale.save()
+
+        list_group.refresh_from_db()
+        self.assertEqual(list_group.name, "B")
+        # post_save 가 한 번 더 올립니다.
+        self.assertEqual(list_group.generation, bumped + 1)
+
+
+class ResolveListGroupIdTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_alias_expires_on_its_own_short_timeout(self):
+        list_group = HomeCategoryListGroup.objects.create(name="A", fwf_id="a")
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.assertEqual(resolve_list_group_id("a"), list_group.pk)
+
+        # 다른 프로세스의 쓰기는 이 프로세스의 캐시를 지우지 못하므로 짧게 보관합니다.
+        cache_set.assert_called_once_with(
+            LIST_GROUP_ID_CACHE_KEY.format("a"),
+            list_group.pk,
+            settings.HOME_CATEGORY_LIST_GROUP_ID_CACHE_TIMEOUT,
+        )
+        self.assertLess(
+            settings.HOME_CATEGORY_LIST_GROUP_ID_CACHE_TIMEOUT,
+            settings.HOME_CATEGORY_PAYLOAD_CACHE_TIMEOUT,
+        )
+
+
+class EventTimelineTest(SimpleTestCase):
+    NOW = datetime(2022, 9, 3, 9, 0, tzinfo=dt_timezone.utc)
+
+    def at(self, minutes, microseconds=0):
+        return self.NOW + timedelta(minutes=minutes, microseconds=microseconds)
+
+    def test_overlapping_windows(self):
+        timeline = EventTimeline(
+            1, [(1, self.at(0), self.at(30)), (2, self.at(10), self.at(20))]
+        )
+
+        self.assertEqual(timeline.active_at(self.at(5)), {1})
+        self.assertEqual(timeline.active_at(self.at(15)), {1, 2})
+        self.assertEqual(timeline.active_at(self.at(25)), {1})
+        self.assertEqual(timeline.next_transition(self.at(5)), self.at(10))
+        self.assertEqual(
+            timeline.next_transition(self.at(15)), self.at(20, microseconds=1)
+        )
+
+    def test_windows_include_their_start_and_end(self):
+        timeline = EventTimeline(1, [(1, self.at(0), self.at(10))])
+
+        self.assertEqual(timeline.active_at(self.at(0, microseconds=-1)), set())
+        self.assertEqual(timeline.active_at(self.at(0)), {1})
+        self.assertEqual(timeline.active_at(self.at(10)), {1})
+        self.assertEqual(timeline.active_at(self.at(10, microseconds=1)), set())
+        # 경계 시각에 있으면 그다음 경계를 돌려줍니다.
+        self.assertEqual(timeline.next_transition(self.at(-1)), self.at(0))
+        self.assertEqual(
+            timeline.next_transition(self.at(0)), self.at(10, microseconds=1)
+        )
+
+    def test_no_upcoming_transition(self):
+        timeline = EventTimeline(1, [(1, self.at(0), self.at(10))])
+
+        self.assertIsNone(timeline.next_transition(self.at(10, microseconds=1)))
+        self.assertIsNone(EventTimeline(1, []).next_transition(self.NOW))
+        self.assertEqual(EventTimeline(1, []).active_at(self.NOW), set())
+        # 끝이 시작보다 이른 창은 무시합니다.
+        self.assertIsNone(
+            EventTimeline(1, [(1, self.at(10), self.at(0))]).next_transition(self.NOW)
+        )
+
+    def test_snapshot_timeout_is_capped_at_the_next_transition(self):
+        timeline = EventTimeline(
+            1,
+            [
+                (1, self.at(-10), self.at(1, microseconds=-1)),
+                (2, self.at(90), self.at(100)),
+            ],
+        )
+
+        manifest, snapshots = _build_snapshots(7, [], timeline, self.NOW)
+        self.assertEqual(manifest.expires_at, self.at(1))
+        self.assertEqual(_cache_snapshots(3, manifest, snapshots, self.NOW)[1], 60)
+
+        far = EventTimeline(1, [(1, self.at(60 * 24), self.at(60 * 25))])
+        manifest, snapshots = _build_snapshots(7, [], far, self.NOW)
+        self.assertEqual(
+            _cache_snapshots(3, manifest, snapshots, self.NOW)[1],
+            settings.HOME_CATEGORY_PAYLOAD_CACHE_TIMEOUT,
+        )
+        manifest, snapshots = _build_snapshots(7, [], EventTimeline(1, []), self.NOW)
+        self.assertIsNone(manifest.expires_at)
+        self.assertEqual(
+            _cache_snapshots(3, manifest, snapshots, self.NOW)[1],
+            settings.HOME_CATEGORY_PAYLOAD_CACHE_TIMEOUT,
+        )
+
+
+class PayloadVariantTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.list_group,) = generate_home_categories(1, 3, 0, images=0, event_every=0)
+        cls.ios_only, cls.android_only, cls.everyone = HomeCategory.objects.filter(
+            list_group=cls.list_group
+        ).order_by("pk")
+        cls.ios_only.min_required_ios_version = "6.14.0"
+        cls.ios_only.save()
+        cls.android_only.min_required_android_version = "7.0"
+        cls.android_only.save()
+
+    def setUp(self):
+        cache.clear()
+        event_image_index.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(event_image_index.clear)
+
+    def test_variant_buckets(self):
+        manifest = PayloadManifest(
+            1, {"ios": [(6, 10, 0), (6, 14, 0)], "android": [(7, 0, 0)]}, None
+        )
+
+        for platform, app_version, variant in (
+            ("ios", "6.14", "ios:2"),
+            ("ios", "6.14.0-qa", "ios:2"),
+            ("ios", "6.13.9", "ios:1"),
+            ("ios", "6.10.0", "ios:1"),
+            ("ios", "6.9.99", "ios:0"),
+            ("ios", None, "ios:0"),
+            ("ios", "beta", "ios:0"),
+            ("android", "1.0", "android:0"),
+            ("android", "7", "android:1"),
+            (None, "6.14", "all"),
+            ("web", "6.14", "all"),
+        ):
+            with self.subTest(platform=platform, app_version=app_version):
+                self.assertEqual(manifest.variant(platform, app_version), variant)
+
+    def codes(self, platform=None, app_version=None):
+        snapshot = get_snapshot(self.list_group.fwf_id, platform, app_version)
+        return {
+            category["code"] for category in json.loads(snapshot.payload)["categories"]
+        }
+
+    def test_categories_are_filtered_by_platform_and_version(self):
+        everything = {self.ios_only.code, self.android_only.code, self.everyone.code}
+
+        self.assertEqual(self.codes(), everything)
+        self.assertEqual(self.codes("ios", "6.14"), everything)
+        self.assertEqual(self.codes("ios", "6.13.9"), everything - {self.ios_only.code})
+        self.assertEqual(
+            self.codes("android", "1.0"), everything - {self.android_only.code}
+        )
+        self.assertEqual(self.codes("android", "7.0.0"), everything)
+        # 버전을 보내지 않거나 읽을 수 없으면 최소 버전이 있는 카테고리를 빼고 보냅니다.
+        self.assertEqual(self.codes("ios"), everything - {self.ios_only.code})
+        self.assertEqual(self.codes("ios", "x.y"), everything - {self.ios_only.code})
+
+
+class FrozenVersionParserTest(SimpleTestCase):
+    def test_migration_0005_parser(self):
+        migration = importlib.import_module(
+            "home_category.migrations.0005_homecategory_parsed_min_required_version"
+        )
+
+        for value, parsed in (
+            (None, None),
+            ("", None),
+            ("6.14", [6, 14, 0]),
+            ("6.14.0", [6, 14, 0]),
+            (" v7", [7, 0, 0]),
+            ("6.14.0-qa", [6, 14, 0]),
+            ("6.14.0.1", [6, 14, 0, 1]),
+            ("beta", []),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(migration.parse(value), parsed)
+
+
+class ListGroupAutocompleteFilterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.default = HomeCategoryListGroup.objects.create(
+            name="기본", fwf_id="default", is_default=True
+        )
+        cls.spring = HomeCategoryListGroup.objects.create(
+            name="봄 캠페인", fwf_id="campaign-spring"
+        )
+        cls.summer = HomeCategoryListGroup.objects.create(
+            name="여름 캠페인", fwf_id="campaign-summer"
+        )
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", None)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def autocomplete(self, term):
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "home_category",
+                "model_name": "homecategory",
+                "field_name": "list_group",
+                "term": term,
+            },
+        )
+        return sorted(result["text"] for result in response.json()["results"])
+
+    def test_changelist_renders_only_the_selected_group(self):
+        response = self.client.get(
+            reverse("admin:home_category_homecategory_changelist"),
+            {"list_group__id__exact": self.spring.pk},
+        )
+
+        self.assertContains(response, 'id="list-group-filter"')
+        self.assertContains(response, str(self.spring))
+        self.assertNotContains(response, str(self.summer))
+
+    def test_autocomplete_matches_name_prefix_or_fwf_id(self):
+        self.assertEqual(self.autocomplete("봄"), [str(self.spring)])
+        self.assertEqual(self.autocomplete("캠페인"), [])
+        self.assertEqual(self.autocomplete("campaign-summer"), [str(self.summer)])
+        self.assertEqual(self.autocomplete("campaign"), [])
+
+
+class GenerateHomeCategoriesTest(TestCase):
+    def test_fwf_ids_continue_after_the_largest_suffix(self):
+        first, second = generate_home_categories(2, 0, 0, images=0, event_every=0)
+        first.delete()
+        (third,) = generate_home_categories(1, 0, 0, images=0, event_every=0)
+        self.assertEqual(
+            [group.fwf_id for group in (second, third)],
+            ["synthetic-1", "synthetic-2"],
+        )
+
+
+class SaveFormsetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.list_group,) = generate_home_categories(1, 1, 2)
+        cls.parent = HomeCategory.objects.get(
+            list_group=cls.list_group, parent_category=None
+        )
+
+    def test_children_are_saved_once_with_the_list_group(self):
+        legacy, changed = self.parent.homecategory_set.order_by("pk")
+        HomeCategory.objects.filter(pk=legacy.pk).update(list_group=None)
+        formset_class = inlineformset_factory(
+            HomeCategory,
+            HomeCategory,
+            fk_name="parent_category",
+            fields=("display_name", "code", "priority"),
+            extra=1,
+        )
+        formset = formset_class(
+            {
+                "homecategory_set-TOTAL_FORMS": "3",
+                "homecategory_set-INITIAL_FORMS": "2",
+                "homecategory_set-0-id": str(legacy.pk),
+                "homecategory_set-0-display_name": legacy.display_name,
+                "homecategory_set-0-code": legacy.code,
+                "homecategory_set-0-priority": str(legacy.priority),
+                "homecategory_set-1-id": str(changed.pk),
+                "homecategory_set-1-display_name": "바뀐 하위",
+                "homecategory_set-1-code": changed.code,
+                "homecategory_set-1-priority": str(changed.priority),
+                "homecategory_set-2-display_name": "새 하위",
+                "homecategory_set-2-code": "new-child",
+                "homecategory_set-2-priority": "3",
+            },
+            instance=self.parent,
+        )
+        self.assertTrue(formset.is_valid(), formset.errors)
+        generation = self.list_group.generation
+
+        with CaptureQueriesContext(connection) as captured:
+            HomeCategoryAdmin(HomeCategory, admin.site).save_formset(
+                None, mock.Mock(instance=self.parent), formset, True
+            )
+
+        writes = [
+            query["sql"].split(" ", 1)[0]
+            for query in captured.captured_queries
+            if '"home_category_homecategory"' in query["sql"].split("SET")[0]
+            and not query["sql"].startswith("SELECT")
+        ]
+        # 바뀐 하위 카테고리, 새 하위 카테고리, 목록 그룹이 빠진 하위 카테고리 일괄 수정
+        self.assertEqual(writes, ["UPDATE", "INSERT", "UPDATE"])
+        self.assertEqual(
+            set(self.parent.homecategory_set.values_list("list_group_id", flat=True)),
+            {self.list_group.pk},
+        )
+        self.assertEqual(self.parent.homecategory_set.count(), 3)
+        self.list_group.refresh_from_db()
+        self.assertGreater(self.list_group.generation, generation)
+
+
+class HomeCategoryListGroupCloneTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # sqlite 도 bulk insert 를 한 번에 하도록 작게 만듭니다.
+        cls.source, cls.target = generate_home_categories(
+            2, 6, 2, deleted_ratio=0.2, seed=0
+        )
+
+    def test_clone_list_copies_active_categories_in_constant_queries(self):
+        HomeCategory.objects.filter(list_group=self.target).delete()
+
+        # 읽기 3 + savepoint 2 + bulk insert 3 + generation 1
+        with self.assertNumQueries(9):
+            self.source.clone_list(self.target)
+
+        source_list = list(
+            HomeCategory.fetch_active_list(list_group=self.source.pk).values_list(
+                "code", flat=True
+            )
+        )
+        cloned = {
+            item.code: item
+            for item in HomeCategory.fetch_active_list(list_group=self.target.pk)
+        }
+        self.assertEqual(sorted(source_list), sorted(cloned))
+        for item in HomeCategory.fetch_active_list(list_group=self.source.pk):
+            clone = cloned[item.code]
+            self.assertEqual(
+                [child.code for child in item.homecategory_set.all()],
+                [child.code for child in clone.homecategory_set.all()],
+            )
+            self.assertEqual(
+                [image.image_url.name for image in item.image_set.all()],
+                [image.image_url.name for image in clone.image_set.all()],
+            )
+
+    def test_clone_list_reads_rows_by_the_ids_it_already_read(self):
+        HomeCategory.objects.filter(list_group=self.target).delete()
+
+        with CaptureQueriesContext(connection) as captured:
+            self.source.clone_list(self.target)
+
+        # 하위 쿼리로 다시 고르면 읽는 사이에 추가된 카테고리의 행이 섞입니다.
+        select_list = [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(len(select_list), 3)
+        for sql in select_list:
+            self.assertEqual(sql.count("SELECT"), 1, sql)
+
+
+class SyncListGroupsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.source, cls.target, cls.empty = generate_home_categories(
+            3, 6, 2, event_every=0
+        )
+        HomeCategory.objects.filter(list_group=cls.empty).delete()
+
+        cls.source_item = HomeCategory.objects.get(
+            list_group=cls.source, code="category-1"
+        )
+        HomeCategory.objects.filter(pk=cls.source_item.pk).update(display_name="변경")
+        HomeCategory.objects.filter(list_group=cls.source, code="category-2").update(
+            is_deleted=True
+        )
+        cls.source_item.image_set.filter(is_event=False).first().delete()
+
+    def test_sync_list_groups(self):
+        created, synced = sync_list_groups(self.source, [self.empty, self.target])
+
+        self.assertEqual(created.list_group_id, self.empty.pk)
+        self.assertEqual(len(created.created), 5 * 3)
+        self.assertEqual(synced.list_group_id, self.target.pk)
+        self.assertEqual(synced.created, ())
+        self.assertEqual(synced.updated, ("category-1",))
+        self.assertEqual(
+            sorted(synced.deleted), ["category-2", "category-2-0", "category-2-1"]
+        )
+        self.assertEqual(synced.images_replaced, ("category-1",))
+
+        expected = serialize_home_categories(
+            HomeCategory.fetch_active_list(list_group=self.source.pk)
+        )
+        for list_group in (self.empty, self.target):
+            self.assertEqual(
+                serialize_home_categories(
+                    HomeCategory.fetch_active_list(list_group=list_group.pk)
+                ),
+                expected,
+            )
+
+        self.assertFalse(
+            any(
+                result.has_changes
+                for result in sync_list_groups(self.source, [self.empty, self.target])
+            )
+        )
+
+
+class DeleteListTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.default = HomeCategoryListGroup.objects.create(name="기본", is_default=True)
+        cls.list_group, cls.other = generate_home_categories(2, 5, 2)
+
+    def test_default_list_group_is_protected(self):
+        with self.assertRaises(SuspiciousOperation):
+            self.default.delete_list()
+
+    def test_delete_list_in_chunks(self):
+        other_rows = (
+            HomeCategory.objects.filter(list_group=self.other).count(),
+            HomeCategoryImage.objects.filter(
+                home_category__list_group=self.other
+            ).count(),
+        )
+
+        # id 조회 1 + 청크마다 (savepoint 2 + 삭제 2) + generation 1
+        with self.assertNumQueries(1 + 2 * 4 + 1):
+            self.list_group.delete_list(chunk_size=8)
+
+        self.assertFalse(
+            HomeCategory.objects.filter(list_group=self.list_group).exists()
+        )
+        self.assertFalse(
+            HomeCategoryImage.objects.filter(
+                home_category__list_group=self.list_group
+            ).exists()
+        )
+        self.assertEqual(
+            (
+                HomeCategory.objects.filter(list_group=self.other).count(),
+                HomeCategoryImage.objects.filter(
+                    home_category__list_group=self.other
+                ).count(),
+            ),
+            other_rows,
+        )
+
+
+class ListGroupJobTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.default = HomeCategoryListGroup.objects.create(name="기본", is_default=True)
+        cls.source, cls.target = generate_home_categories(2, 4, 2)
+        HomeCategory.objects.filter(list_group=cls.target).delete()
+
+    def run_enqueued(self, kind, list_group, **params):
+        # TestCase 안에서는 on_commit 이 실행되지 않으므로 worker 대신 직접 실행합니다.
+        job = enqueue_job(kind, list_group, **params)
+        self.assertEqual(job.state, HomeCategoryListGroupJobState.QUEUED.value)
+        run_job(job.pk)
+        run_job(job.pk)
+        job.refresh_from_db()
+        return job
+
+    def test_clone_job(self):
+        job = self.run_enqueued(
+            HomeCategoryListGroupJobKind.CLONE, self.target, source_id=self.source.pk
+        )
+
+        self.assertEqual(job.state, HomeCategoryListGroupJobState.SUCCEEDED.value)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(
+            HomeCategory.objects.filter(list_group=self.target).count(),
+            HomeCategory.objects.filter(list_group=self.source).count(),
+        )
+
+    def test_clone_job_is_safe_to_rerun(self):
+        job = self.run_enqueued(
+            HomeCategoryListGroupJobKind.CLONE, self.target, source_id=self.source.pk
+        )
+        cloned = HomeCategory.objects.filter(list_group=self.target).count()
+        # 복제를 커밋한 뒤 성공을 기록하기 전에 프로세스가 종료된 경우
+        HomeCategoryListGroupJob.objects.filter(pk=job.pk).update(
+            state=HomeCategoryListGroupJobState.QUEUED.value
+        )
+
+        run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, HomeCategoryListGroupJobState.SUCCEEDED.value)
+        self.assertIn("이미 복제되어 있습니다", job.result)
+        self.assertEqual(
+            HomeCategory.objects.filter(list_group=self.target).count(), cloned
+        )
+
+    def test_delete_job(self):
+        job = self.run_enqueued(HomeCategoryListGroupJobKind.DELETE, self.source)
+
+        self.assertEqual(job.state, HomeCategoryListGroupJobState.SUCCEEDED.value)
+        self.assertIsNone(job.list_group)
+        self.assertFalse(
+            HomeCategoryListGroup.objects.filter(pk=self.source.pk).exists()
+        )
+        self.assertFalse(HomeCategory.objects.filter(list_group=self.source).exists())
+
+    def test_failed_job_keeps_error(self):
+        job = self.run_enqueued(HomeCategoryListGroupJobKind.DELETE, self.default)
+
+        self.assertEqual(job.state, HomeCategoryListGroupJobState.FAILED.value)
+        self.assertIn("SuspiciousOperation", job.error)
+        self.assertTrue(
+            HomeCategoryListGroup.objects.filter(pk=self.default.pk).exists()
+        )
+
+    def test_clone_target_resolves_to_default_until_the_job_succeeds(self):
+        job = enqueue_job(
+            HomeCategoryListGroupJobKind.CLONE, self.target, source_id=self.source.pk
+        )
+        self.assertEqual(resolve_list_group_id(self.target.fwf_id), self.default.pk)
+
+        run_job(job.pk)
+
+        self.assertEqual(resolve_list_group_id(self.target.fwf_id), self.target.pk)
+
+    def test_leftover_jobs_are_reclaimed(self):
+        now = timezone.now()
+        interval = timedelta(seconds=settings.HOME_CATEGORY_JOB_HEARTBEAT_INTERVAL)
+        stale, alive, queued, just_queued = [
+            enqueue_job(HomeCategoryListGroupJobKind.DELETE, self.source)
+            for _ in range(4)
+        ]
+        HomeCategoryListGroupJob.objects.update(created_at=now - 2 * interval)
+        HomeCategoryListGroupJob.objects.filter(pk=just_queued.pk).update(
+            created_at=now
+        )
+        HomeCategoryListGroupJob.objects.filter(pk=stale.pk).update(
+            state=HomeCategoryListGroupJobState.RUNNING.value,
+            progress=40,
+            heartbeat_at=now - 4 * interval,
+        )
+        HomeCategoryListGroupJob.objects.filter(pk=alive.pk).update(
+            state=HomeCategoryListGroupJobState.RUNNING.value, heartbeat_at=now
+        )
+
+        self.assertEqual(reclaim_jobs(now), [stale.pk, queued.pk])
+        stale.refresh_from_db()
+        self.assertEqual(stale.state, HomeCategoryListGroupJobState.QUEUED.value)
+        self.assertEqual(stale.progress, 0)
+        alive.refresh_from_db()
+        self.assertEqual(alive.state, HomeCategoryListGroupJobState.RUNNING.value)
+
+
+class ListGroupAdminDeleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.default = HomeCategoryListGroup.objects.create(name="기본", is_default=True)
+        cls.spring = HomeCategoryListGroup.objects.create(
+            name="봄 캠페인", fwf_id="campaign-spring"
+        )
+        cls.summer = HomeCategoryListGroup.objects.create(
+            name="여름 캠페인", fwf_id="campaign-summer"
+        )
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", None)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assertOnlyQueuedNotices(self, response, count):
+        notices = [str(message) for message in response.context["messages"]]
+        self.assertEqual(len(notices), count)
+        for notice in notices:
+            self.assertIn("작업이 등록되었습니다", notice)
+        # 삭제는 작업이 끝나야 일어나므로 그룹은 아직 남아 있습니다.
+        self.assertEqual(
+            HomeCategoryListGroupJob.objects.filter(
+                kind=HomeCategoryListGroupJobKind.DELETE.value
+            ).count(),
+            count,
+        )
+        self.assertEqual(HomeCategoryListGroup.objects.count(), 3)
+
+    def test_delete_view_reports_the_queued_job(self):
+        response = self.client.post(
+            reverse(
+                "admin:home_category_homecategorylistgroup_delete",
+                args=[self.spring.pk],
+            ),
+            {"post": "yes"},
+            follow=True,
+        )
+
+        self.assertOnlyQueuedNotices(response, 1)
+
+    def test_delete_action_reports_the_queued_jobs(self):
+        response = self.client.post(
+            reverse("admin:home_category_homecategorylistgroup_changelist"),
+            {
+                "action": "delete_selected",
+                "_selected_action": [self.spring.pk, self.summer.pk],
+                "post": "yes",
+            },
+            follow=True,
+        )
+
+        self.assertOnlyQueuedNotices(response, 2)
+
+
+def png_header(width, height):
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I4sIIBBBBB", 13, b"IHDR", width, height, 8, 6, 0, 0, 0)
+        + b"\x00" * 4
+    )
+
+
+class IconImageValidatorTest(SimpleTestCase):
+    def test_read_image_info(self):
+        jpeg = (
+            b"\xff\xd8"
+            + b"\xff\xe1"
+            + struct.pack(">H", 2 + 40000)
+            + b"\x00" * 40000
+            + b"\xff\xc0"
+            + struct.pack(">HBHHB", 11, 8, 168, 234, 3)
+        )
+        webp_lossy = b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00\x00\x00" + (
+            b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 204, 204)
+        )
+        webp_lossless = b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00" + (
+            b"\x2f" + struct.pack("<I", (273 - 1) | (273 - 1) << 14) + b"\x00" * 5
+        )
+
+        for data, expected in (
+            (png_header(204, 204), ("png", 204, 204)),
+            (jpeg, ("jpeg", 234, 168)),
+            (webp_lossy, ("webp", 204, 204)),
+            (webp_lossless, ("webp", 273, 273)),
+        ):
+            fp = io.BytesIO(data)
+            fp.seek(3)
+            self.assertEqual(read_image_info(fp), expected)
+            self.assertEqual(fp.tell(), 3)
+
+        for data in (b"GIF89a\x00\x00", b"\x89PNG\r\n\x1a\n\x00", b"\xff\xd8\xff\xda"):
+            with self.assertRaises(ImageHeaderError):
+                read_image_info(io.BytesIO(data))
+
+    def test_validators_read_only_the_header(self):
+        # 픽셀 데이터 없이 거대한 크기를 주장하는 파일도 헤더만 읽고 거절합니다.
+        image = SimpleUploadedFile(
+            "huge.png", png_header(60000, 60000), content_type="image/png"
+        )
+        validate_home_category_icon_image_filetype(image)
+        with self.assertRaises(ValidationError):
+            validate_home_category_icon_image_size(image)
+
+        image = SimpleUploadedFile("icon.png", png_header(204, 204))
+        validate_home_category_icon_image_filesize(image)
+        validate_home_category_icon_image_size(image)
+
+        with self.assertRaises(ValidationError):
+            validate_home_category_icon_image_filetype(
+                SimpleUploadedFile("icon.png", b"not an image")
+            )
+
+
+class LottieMinifyTest(SimpleTestCase):
+    LOTTIE = {
+        "v": "5.7.4",
+        "fr": 29.97,
+        "ip": 0,
+        "op": 90.0000001,
+        "w": 273,
+        "h": 273,
+        "nm": '아이콘 "q"',
+        "layers": [{"ks": {"k": [12.34567, -0.00001, 1e-7, 100]}, "hd": False}],
+    }
+
+    def test_minify_lottie(self):
+        raw = json.dumps(self.LOTTIE, indent=4, ensure_ascii=False).encode("utf-8")
+
+        expected = dict(
+            self.LOTTIE,
+            op=90,
+            layers=[{"ks": {"k": [12.346, 0, 0, 100]}, "hd": False}],
+        )
+        expected = json.dumps(expected, ensure_ascii=False, separators=(",", ":"))
+
+        # 토큰이 청크 경계에서 잘리는 경우를 포함하도록 작은 청크로 읽습니다.
+        for chunk_size in (1, 5, 4096):
+            minified = minify_lottie(io.BytesIO(raw), len(raw), 8, 3, chunk_size)
+            self.assertEqual(minified.decode("utf-8"), expected)
+
+    def test_rejects_invalid_files(self):
+        raw = json.dumps(self.LOTTIE).encode("utf-8")
+        for data, max_bytes, max_depth in (
+            (raw, len(raw) - 1, 8),
+            (raw, len(raw), 3),
+            (raw[:-1], len(raw), 8),
+            (b'{"v": 1}', 100, 8),
+            (b"[1, 2]", 100, 8),
+            (b'{"v": 1,}', 100, 8),
+        ):
+            with self.assertRaises(LottieError):
+                minify_lottie(io.BytesIO(data), max_bytes, max_depth, 3)
+
+
+class ContentAddressedUploadTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = FileSystemStorage(location=directory.name)
+        patcher = mock.patch(
+            "home_category.uploads.S3_REVIEW_IMAGE_BUCKET_STORAGE", self.storage
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, *contents):
+        tasks = []
+        for index, content in enumerate(contents):
+            file_ = SimpleUploadedFile("icon {}.PNG".format(index), content)
+            tasks.append(UploadTask(content_addressed_path("icons", file_), file_))
+        return upload_files(tasks)
+
+    def test_identical_content_is_stored_once(self):
+        first, same, other = self.upload(b"icon", b"icon", b"other")
+
+        self.assertEqual(
+            first, "icons/{}.png".format(hashlib.sha256(b"icon").hexdigest())
+        )
+        self.assertEqual(first, same)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(self.storage.listdir("icons")[1]), 2)
+
+        with mock.patch.object(self.storage, "save") as save:
+            self.assertEqual(self.upload(b"icon"), [first])
+        save.assert_not_called()
+
+
+class FailingStorage(FileSystemStorage):
+    """Fails to save files whose content contains `marker`, and records what it saved."""
+
+    def __init__(self, marker, **kwargs):
+        super(FailingStorage, self).__init__(**kwargs)
+        self.marker = marker
+        self.saved = []
+
+    def _save(self, name, content):
+        content.seek(0)
+        if self.marker in content.read():
+            raise OSError("업로드 실패")
+        content.seek(0)
+        name = super(FailingStorage, self)._save(name, content)
+        self.saved.append(name)
+        return name
+
+
+@override_settings(HOME_CATEGORY_UPLOAD_RETRY_BACKOFF=0)
+class ImageFormsetUploadTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (list_group,) = generate_home_categories(1, 1, 0, images=0, event_every=0)
+        cls.home_category = HomeCategory.objects.get(list_group=list_group)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = FailingStorage(b"broken", location=directory.name)
+        patcher = mock.patch(
+            "home_category.uploads.S3_REVIEW_IMAGE_BUCKET_STORAGE", self.storage
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def formset(self, *names):
+        formset_class = inlineformset_factory(
+            HomeCategory,
+            HomeCategoryImage,
+            form=HomeCategoryImageForm,
+            formset=HomeCategoryImageInlineFormset,
+            fields=("image_type", "image_file", "lottie_file"),
+            extra=len(names),
+        )
+        data = {
+            "category_type": HomeCategoryType.DEFAULT.value,
+            "image_set-TOTAL_FORMS": str(len(names)),
+            "image_set-INITIAL_FORMS": "0",
+        }
+        files = {}
+        for index, name in enumerate(names):
+            data["image_set-{}-image_type".format(index)] = "lottie_file"
+            lottie = dict(LottieMinifyTest.LOTTIE, nm=name)
+            files["image_set-{}-lottie_file".format(index)] = SimpleUploadedFile(
+                "{}.json".format(name), json.dumps(lottie).encode("utf-8")
+            )
+        return formset_class(data, files, instance=self.home_category)
+
+    def test_images_are_uploaded_while_validating(self):
+        formset = self.formset("first", "second")
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertTrue(formset.is_valid(), formset.errors)
+        self.assertEqual(len(self.storage.saved), 2)
+        self.assertEqual(
+            sorted(form.uploaded_image_url for form in formset.forms),
+            sorted(self.storage.saved),
+        )
+        self.assertFalse(
+            [query for query in captured.captured_queries if "INSERT" in query["sql"]]
+        )
+
+        with mock.patch.object(self.storage, "save") as save:
+            formset.save()
+        save.assert_not_called()
+        self.assertEqual(
+            sorted(self.home_category.image_set.values_list("image_url", flat=True)),
+            sorted(self.storage.saved),
+        )
+
+    def test_failed_upload_is_a_form_error_and_keeps_stored_files(self):
+        formset = self.formset("first", "broken")
+
+        self.assertFalse(formset.is_valid())
+        self.assertEqual(formset.errors[0], {})
+        self.assertIn("파일을 올리지 못했습니다", formset.errors[1]["lottie_file"][0])
+        self.assertFalse(self.home_category.image_set.exists())
+        # 내용 주소 파일은 다른 카테고리가 쓰고 있을 수 있으므로 지우지 않습니다.
+        self.assertEqual(len(self.storage.saved), 1)
+        self.assertTrue(self.storage.exists(self.storage.saved[0]))
+
+        # 같은 파일을 다시 올리면 남은 파일을 그대로 씁니다.
+        formset = self.formset("first")
+        with mock.patch.object(self.storage, "save") as save:
+            self.assertTrue(formset.is_valid(), formset.errors)
+        save.assert_not_called()
+        self.assertEqual(formset.forms[0].uploaded_image_url, self.storage.saved[0])
+
+
+@override_settings(
+    REVIEW_IMAGE_S3_BUCKET="home-category-test",
+    REVIEW_IMAGE_S3_ENDPOINT_URL=None,
+    REVIEW_IMAGE_S3_MULTIPART_THRESHOLD=5 * 1024 * 1024,
+    REVIEW_IMAGE_S3_MULTIPART_CHUNKSIZE=5 * 1024 * 1024,
+)
+class S3StorageTest(SimpleTestCase):
+    """Runs `S3Storage` against moto's in-process S3."""
+
+    def setUp(self):
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        self.storage = S3Storage()
+        self.storage.client.create_bucket(
+            Bucket="home-category-test",
+            CreateBucketConfiguration={"LocationConstraint": "ap-northeast-2"},
+        )
+        patcher = mock.patch(
+            "home_category.uploads.S3_REVIEW_IMAGE_BUCKET_STORAGE", self.storage
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def head(self, name):
+        return self.storage.client.head_object(Bucket="home-category-test", Key=name)
+
+    def test_upload_sets_content_type_and_cache_control(self):
+        lottie = SimpleUploadedFile("icon.json", b"{}")
+        (path,) = upload_files(
+            [UploadTask(content_addressed_path("icons", lottie), lottie)]
+        )
+
+        self.assertTrue(self.storage.exists(path))
+        self.assertFalse(self.storage.exists("icons/missing.json"))
+        self.assertEqual(self.storage.size(path), 2)
+        self.assertEqual(self.storage.open(path).read(), b"{}")
+        head = self.head(path)
+        self.assertEqual(head["ContentType"], "application/json")
+        self.assertEqual(head["CacheControl"], "public, max-age=31536000, immutable")
+        self.assertEqual(
+            self.storage.url("icons/새 아이콘.png"),
+            "https://dev-rev-static.yogiyo.co.kr/icons/"
+            "%EC%83%88%20%EC%95%84%EC%9D%B4%EC%BD%98.png",
+        )
+
+        self.storage.delete(path)
+        self.assertFalse(self.storage.exists(path))
+
+    def test_large_files_are_uploaded_in_parts(self):
+        large = SimpleUploadedFile("large.json", b"0" * (11 * 1024 * 1024))
+        path = self.storage.save("icons/large.json", large)
+
+        self.assertEqual(path, "icons/large.json")
+        self.assertTrue(self.head(path)["ETag"].endswith('-3"'))
+        self.assertEqual(self.storage.size(path), 11 * 1024 * 1024)
+
+
+class FullImageUrlTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.list_group,) = generate_home_categories(1, 2, 0, images=2, event_every=0)
+
+    def setUp(self):
+        cached_s3_review_image_bucket_url.cache_clear()
+
+    def test_url_is_stored_at_write_time(self):
+        image = HomeCategoryImage.objects.filter(
+            home_category__list_group=self.list_group
+        ).first()
+        self.assertEqual(image.full_image_url, image.resolve_full_image_url())
+
+        image.image_url = "home_categories/images/새 아이콘.png"
+        image.save()
+        image.refresh_from_db()
+        self.assertEqual(
+            image.full_image_url,
+            "https://dev-rev-static.yogiyo.co.kr/home_categories/images/"
+            "%EC%83%88%20%EC%95%84%EC%9D%B4%EC%BD%98.png",
+        )
+
+    def test_url_of_a_new_file_uses_the_stored_name(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        field = HomeCategoryImage._meta.get_field("image_url")
+        with mock.patch.object(
+            field, "storage", FileSystemStorage(location=directory.name)
+        ):
+            image = HomeCategoryImage.objects.create(
+                home_category=HomeCategory.objects.filter(
+                    list_group=self.list_group
+                ).first(),
+                image_url=SimpleUploadedFile("새 아이콘.png", b"icon"),
+            )
+
+        self.assertEqual(image.image_url.name, "restaurants/detail_image/새_아이콘.png")
+        image.refresh_from_db()
+        self.assertEqual(
+            image.full_image_url,
+            "https://dev-rev-static.yogiyo.co.kr/restaurants/detail_image/"
+            "%EC%83%88_%EC%95%84%EC%9D%B4%EC%BD%98.png",
+        )
+
+    def test_legacy_rows_fall_back_to_computed_url(self):
+        HomeCategoryImage.objects.update(full_image_url="")
+        item_list = list(HomeCategory.fetch_active_list(list_group=self.list_group))
+
+        images = serialize_home_categories(item_list)[0]["images"]
+        self.assertEqual(images, item_list[0].to_dict()["images"])
+        self.assertEqual(
+            images,
+            [img.resolve_full_image_url() for img in item_list[0].image_set.all()],
+        )
+
+    @override_settings(REVIEW_IMAGE_HOST="https://rev-static.example.com")
+    def test_recompute_command(self):
+        generation = self.list_group.generation
+        HomeCategoryImage.objects.filter(
+            pk=HomeCategoryImage.objects.first().pk
+        ).update(full_image_url="")
+
+        out = io.StringIO()
+        call_command("recompute_home_category_image_urls", batch_size=3, stdout=out)
+
+        self.assertIn("4 개 중 4 개", out.getvalue())
+        for image in HomeCategoryImage.objects.all():
+            self.assertTrue(
+                image.full_image_url.startswith("https://rev-static.example.com/")
+            )
+        self.list_group.refresh_from_db()
+        self.assertEqual(self.list_group.generation, generation + 1)
+
+
+class ResponseRecorderTest(SimpleTestCase):
+    def test_buffer_is_flushed_on_a_time_bound(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        recorder = ResponseRecorder(directory.name, flush_interval=0.05)
+
+        recorder.record(time.time(), 1500, 200, 1024, 1, "android:12", bytes(16))
+
+        deadline = time.monotonic() + 5
+        while not list(read_records(directory.name)):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        (record,) = read_records(directory.name)
+        self.assertEqual(
+            (record.latency_us, record.size, record.list_group_id, record.variant),
+            (1500, 1024, 1, "android:12"),
+        )
+
+
+class TtlSimulatorTest(SimpleTestCase):
+    STARTED_AT = 1662192000.0
+
+    def replay(self, ttl):
+        old, new = bytes(16), b"\x01" * 16
+        # 25초에 목록 그룹 1 의 응답이 바뀝니다.
+        records = [
+            ResponseRecord(self.STARTED_AT + second, 1000, 200, 512, 1, "all", digest)
+            for second, digest in ((0, old), (10, old), (20, old), (30, new), (40, new))
+        ]
+        return simulate(records, ttl)[local_hour(self.STARTED_AT)]
+
+    def test_replay(self):
+        never = self.replay(0)
+        self.assertEqual((never.requests, never.hits, never.stale_hits), (5, 0, 0))
+
+        short = self.replay(15)
+        self.assertEqual((short.requests, short.hits, short.stale_hits), (5, 2, 1))
+        self.assertEqual((short.hit_ratio, short.stale_ratio), (0.4, 0.2))
+        # 30초의 stale 응답부터 20초에 저장한 항목이 만료되는 35초까지
+        self.assertEqual(short.stale_seconds, 5.0)
+
+        long = self.replay(60)
+        self.assertEqual((long.hit_ratio, long.stale_ratio), (0.8, 0.4))
+        # 마지막 요청 (40초) 까지
+        self.assertEqual(long.stale_seconds, 10.0)
+
+    def test_variants_are_cached_separately(self):
+        # 변경 없이 같은 generation 의 두 variant 가 번갈아 요청됩니다.
+        records = [
+            ResponseRecord(self.STARTED_AT + second, 1000, 200, 512, 1, variant, digest)
+            for second in range(0, 40, 10)
+            for variant, digest in (("ios:0", bytes(16)), ("ios:1", b"\x01" * 16))
+        ]
+
+        stats = simulate(records, 60)[local_hour(self.STARTED_AT)]
+        self.assertEqual((stats.hit_ratio, stats.stale_ratio), (0.75, 0.0))
+
+    def test_recommend(self):
+        hour = local_hour(self.STARTED_AT)
+        stats_by_ttl = {ttl: {hour: self.replay(ttl)} for ttl in (0, 15, 60)}
+
+        self.assertEqual(recommend(stats_by_ttl, hour, 0.2), 15)
+        self.assertEqual(recommend(stats_by_ttl, hour, 0.5), 60)
+        self.assertEqual(recommend(stats_by_ttl, hour, 0.0), 0)
+        # 허용 범위 안의 TTL 이 없거나 그 시간대의 기록이 없으면 가장 짧은 TTL
+        self.assertEqual(recommend(stats_by_ttl, hour, -1), 0)
+        self.assertEqual(recommend(stats_by_ttl, (hour + 1) % 24, 0.5), 0)
@@ -0,0 +1,82 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.utils.timezone import localtime
+
+
+class TtlStats:
+    __slots__ = ("requests", "hits", "stale_hits", "stale_seconds")
+
+    def __init__(self):
+        self.requests = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.stale_seconds = 0.0
+
+    @property
+    def hit_ratio(self):
+        return self.hits / self.requests if self.requests else 0.0
+
+    @property
+    def stale_ratio(self):
+        return self.stale_hits / self.requests if self.requests else 0.0
+
+
+def local_hour(timestamp):
+    return localtime(datetime.fromtimestamp(timestamp, tz=timezone.utc)).hour
+
+
+def simulate(records, ttl):
+    """Replays `records` (`ResponseRecord`s ordered by time) through a cache that keeps
+    each payload variant of a list group for `ttl` seconds.
+
+    The variants of one generation have different digests, so entries are keyed by
+    (list group, variant) like the payload cache. The recorded digest is taken as the
+    true payload of its variant at that moment. A hit whose cached digest differs from
+    it is stale; the stale window runs from that request until the cached entry
+    expires. Returns `{hour of day: TtlStats}`."""
+    stats = defaultdict(TtlStats)
+    cached = {}  # (list group id, variant) -> (stored at, digest)
+    stale_since = {}  # (list group id, variant) -> (time, hour) of the first stale hit
+
+    def close_stale_window(key, until):
+        opened_at, hour = stale_since.pop(key)
+        stats[hour].stale_seconds += max(until - opened_at, 0.0)
+
+    last_timestamp = 0.0
+    for record in records:
+        last_timestamp = record.timestamp
+        hour = local_hour(record.timestamp)
+        bucket = stats[hour]
+        bucket.requests += 1
+
+        key = (record.list_group_id, record.variant)
+        entry = cached.get(key)
+        if entry is not None and record.timestamp < entry[0] + ttl:
+            bucket.hits += 1
+            if entry[1] != record.digest:
+                bucket.stale_hits += 1
+                stale_since.setdefault(key, (record.timestamp, hour))
+            continue
+
+        if key in stale_since:
+            close_stale_window(key, entry[0] + ttl)
+        cached[key] = (record.timestamp, record.digest)
+
+    for key in list(stale_since):
+        stored_at = cached[key][0]
+        close_stale_window(key, min(stored_at + ttl, last_timestamp))
+    return stats
+
+
+def recommend(stats_by_ttl, hour, max_stale_ratio):
+    """Picks the TTL with the best hit ratio among those serving at most
+    `max_stale_ratio` stale responses in `hour`; falls back to the shortest TTL."""
+    candidates = [
+        (stats[hour].hit_ratio, -ttl, ttl)
+        for ttl, stats in stats_by_ttl.items()
+        if hour in stats and stats[hour].stale_ratio <= max_stale_ratio
+    ]
+    if not candidates:
+        return min(stats_by_ttl)
+    return max(candidates)[2]
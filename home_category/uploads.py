@@ -0,0 +1,88 @@
+import hashlib
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from helpers.consts import S3_REVIEW_IMAGE_BUCKET_STORAGE
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+upload_executor = ThreadPoolExecutor(
+    max_workers=settings.HOME_CATEGORY_UPLOAD_WORKERS,
+    thread_name_prefix="home-category-upload",
+)
+
+
+class UploadTask(namedtuple("UploadTask", ["path", "file"])):
+    __slots__ = ()
+
+
+class ImageUploadError(Exception):
+    def __init__(self, message, path):
+        super(ImageUploadError, self).__init__(message)
+        self.path = path
+
+
+def content_addressed_path(directory, file):
+    """Returns `<directory>/<sha256 of the content><extension>` for an uploaded file.
+
+    Identical bytes always map to the same path, so an icon reused across categories
+    and list groups is stored once and its URL never changes meaning, which lets CDNs
+    cache it forever."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    extension = os.path.splitext(file.name or "")[1].lower()
+    return "{}/{}{}".format(directory, digest.hexdigest(), extension)
+
+
+def _upload(task, attempts, backoff):
+    for attempt in range(attempts):
+        try:
+            # 같은 내용의 파일이 이미 있으면 다시 올리지 않습니다.
+            if S3_REVIEW_IMAGE_BUCKET_STORAGE.exists(task.path):
+                return task.path
+            # 재시도할 때 앞선 시도가 읽은 위치부터 올리지 않도록 되감습니다.
+            task.file.seek(0)
+            return S3_REVIEW_IMAGE_BUCKET_STORAGE.save(task.path, task.file)
+        except Exception as err:
+            if attempt + 1 == attempts:
+                raise ImageUploadError(
+                    "{} 업로드에 실패했습니다: {}".format(task.path, err), task.path
+                ) from err
+            time.sleep(backoff * 2**attempt)
+
+
+def upload_files(tasks, attempts=None, backoff=None):
+    """Uploads `tasks` concurrently on the shared upload pool and returns their storage
+    paths in the same order. Tasks with the same path are uploaded once, and paths
+    that already exist in the storage are not uploaded again.
+
+    Each upload is retried with exponential backoff. When one of them runs out of
+    attempts, the uploads that have not started yet are cancelled and `ImageUploadError`
+    is raised, so callers upload everything before they write to the database.
+
+    Files stored before a failure, or for a form that turns out invalid, stay in the
+    storage. They are never deleted: a content-addressed path may already be used by
+    another category, and a leftover is reused when the same file is uploaded again."""
+    attempts = attempts or settings.HOME_CATEGORY_UPLOAD_ATTEMPTS
+    if backoff is None:
+        backoff = settings.HOME_CATEGORY_UPLOAD_RETRY_BACKOFF
+
+    futures = {}
+    for task in tasks:
+        if task.path not in futures:
+            futures[task.path] = upload_executor.submit(
+                _upload, task, attempts, backoff
+            )
+    try:
+        return [futures[task.path].result() for task in tasks]
+    except Exception:
+        for future in futures.values():
+            future.cancel()
+        raise
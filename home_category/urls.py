@@ -0,0 +1,10 @@
+from django.urls import path
+
+from home_category import views
+
+app_name = "home_category"
+
+urlpatterns = [
+    path("", views.home_category_list, name="list"),
+    path("preview/", views.home_category_preview, name="preview"),
+]
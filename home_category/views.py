@@ -1,3 +1,54 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (HttpResponse, HttpResponseBadRequest,
+                         HttpResponseNotAllowed)
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from home_category.payloads import aget_snapshot, preview_snapshot
+from home_category.recorder import record_home_category_response
+
+
+@record_home_category_response
+async def home_category_list(request):
+    # require_GET 은 async view 를 감싸지 못하므로 (Django 4.1) 직접 확인합니다.
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    snapshot = await aget_snapshot(
+        request.GET.get("fwf_id"),
+        platform=request.GET.get("platform"),
+        app_version=request.GET.get("app_version"),
+    )
+    etag = '"{}"'.format(snapshot.digest)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(snapshot.payload, content_type="application/json")
+    response["ETag"] = etag
+    response.snapshot = snapshot
+    return response
+
+
+@staff_member_required
+@require_GET
+def home_category_preview(request):
+    """Renders the home category list as of `at` (ISO 8601, e.g. 2022-09-03T09:00:00+09:00)
+    so operators can check scheduled event images before they go live."""
+    try:
+        at = parse_datetime(request.GET.get("at", ""))
+    except ValueError:
+        at = None
+    if at is None:
+        return HttpResponseBadRequest("at 파라미터에 ISO 8601 형식의 시각을 입력해주세요.")
+    if timezone.is_naive(at):
+        at = timezone.make_aware(at)
+
+    snapshot = preview_snapshot(
+        request.GET.get("fwf_id"),
+        at,
+        platform=request.GET.get("platform"),
+        app_version=request.GET.get("app_version"),
+    )
+    return HttpResponse(snapshot.payload, content_type="application/json")